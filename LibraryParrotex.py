@@ -15,26 +15,51 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 
-import operator
-import webbrowser
+# Startup is timed from here on, see --bench
+from time import perf_counter
+START = perf_counter()
+
+import os
+import sys
+import gzip
+import sqlite3
+from argparse import ArgumentParser
+from bisect import bisect_left, insort
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from csv import reader as cread
 from csv import writer as cwrite
 from datetime import date
+from html.parser import HTMLParser
 from json import dump as jdump
+from json import dumps as jdumps
 from json import load as jload
 from json import loads as jloads
-import isbnlib as isbn
 import PySimpleGUI as sg
-import requests
 import re
-from time import sleep
+from threading import Event, Lock
+from time import sleep, time
 from math import ceil
+IMPORTED = perf_counter()
 
 
 # Parrot icon in Base64
 ICON = "iVBORw0KGgoAAAANSUhEUgAAAEAAAABACAYAAACqaXHeAAAR/HpUWHRSYXcgcHJvZmlsZSB0eXBlIGV4aWYAAHjapZrpceSwkoT/w4o1gbgBc3BGPA/W/P0KPJp9SaO3UoyawyYJoI7MrALV+N//TPU//ARjknI+ppBD2Phx2WVTOEjb/lPWX7259Xf9uOMr/v90Xl1fGE5ZPu3+3xSO68/z+nrA/lE48rcHpXZ8UZ+/yMcIJr08yOwfVmYkx/14UD4eZM3+hT4eUPZlbSGneF9CHftnP1eS9n9K/rj0PO23/0es1z3jWGOG1Xbjr7Vun4CVf1bZwkHkr7GYg2PNseayYp09l4pBPtnp+snMaI7DFe8XPXnlOtKfz6tXbzlzXGJfjByuz4/nlfYvX9hrHPMUP+k4Ms/nN6/jPqMX68u/OXuaa82soriAqcOxqHMp64jrKkPI0EkxtbBF/nkeEddv5jcR1Y1Q6FvbKr9NZ21w19ROd1301GN9Nt2YojNDmciBMQ2nyclko8mmLe85+dXTRJtttwm/tt3t1lxz0WvYvDW1RkuM3DWXGs3DNLf8+Vf99YY5JRW03tJlK+ZljBibaYjn5C+X4RE9D6P6ZeDz9/VH/GrxoBcrS4pkDFv3R1SvH0hgl6MtF3o+9xzUsR8PwEQM7ZmMtngAr2nrddBbNCZqjSETDipM3VhnKh7Q3pvOJI2zNuCbZGRobol6XWq84bTiPGAmeWUDOZfwUMFZznniJ7pEDBVvvfPeBx998tmXYIMLPoQQg4BiiTY6FX0MMcYUcyzJJpd8CimmlHIq2WQLaPoccswp51wKYxaeXLi7cEEp1VRbXfWqhhprqrmWRvg013wLLbbUcivddNvBjx567KnnXoYehNJww48w4kgjjzIJtWnVdNPPMONMM89yee1w69vvH7ymD6+Z5Sm5MF5e42yM5yO0wIkXn+Ewo5zG41FcQEAb8dmWtHNGPCc+2zLwZ71hkl581rV4DA+6oY2f+vSdMrtHxXP/L7+p6J78Zv5bzylx3R899+63T17rQkNteWzPQjHqZsk+vh+pmFSE7N4+1euJUWLTkFefM7kaR69z5DmDm9XMHOc0zLX1XmuMszqrE1eUHlUJMfnY5MYtNSYExppgZ8hcFtqcOehqw+i9z9E1V4zZTW2zYWvv4jZj4plZmZHLHDFYXbIfduu25KHxUeyu8jd3wFBG2dyQvyBN2hjI1wliVjuHdnzdlYvEonFTLqqw4vnFy/npbWEeg1nhiTi5jiDGH3ZU7W3NangssBEIcxS7Rs4GS+CemMVRa1ou6GlL6dxbvW99RlNjb6mmYIqrw3SnsAHBMEsONYepcwT+mZXps+o4S+SRdrQ6mEWrPM7GsBwAvRCVc1TfiSDbVHIlZDdsK7X2ZQXCsQebius9l6rHFplTwWHNZJZbErEyXF6LDtEPX/0oQ8FQBDcpg4cHAeUxz0jJO1w4gEHntaztPBLd8/FTbb9cQK6OmSWutiBzaIZUDRjTLTcwbqmNicIiOVjiXUKsctbmNiRSkty420ubWddDxGJF/Db8XBYz8wow1QYJO7Inn2IrI/icY+WGDnIk3Nzz9OQ8ec7BqNPGWnVPey5MnUbY5MgoNMM6+P5p/8mb6t2dRNaAUcUku0HMius5D4OstDmtEU9rKEmcPmWa5A1w40OzfFcbrup2Wu6OFuTh+Vs1I8VW/adwUE/xgDm40pObzsvcK2kWyY6+/RoP6h/9fnn9vsh6W6R68nnNfrl8iiAHUCo5tqKF5bshlrUJ8OytI7NCwgsjVusHj1Mpwv2+zyyCgLl44qalX6P07VN5GOb3uP0WthXs76a0oJXO1W85WkOigaybp0Byo+XeAFVAzDfc4be1RMgA/GzgEnQx4BFW7EEksh6mxXlAJqg7B3DVva5yJcbZWpyaaRS5ftoW/APJm78jOUdGnVDOym5QnnQnFZLBshYlXgsKtneJ3QLiucIPPHEkyujUGuqeD/8lgxCEoSgUMbIYsmsZ8s88rlayC5A2YiGJBa/HbiErFhoSCSRCzs3xCF9iYKiqchxDnk80W9sw9Wy2bMuXJJxemXAknNtu6SZ+7I+Ey+ruSHFH8Sa5EDhrW6ukcJ9IAOeLEzjZEaEatP4L2SrznYXXJyko/hKBnRyEIf5KmlBhdnH5qzO8pEgUf0mZANIVIMz6VgV8uF0WwApgSCa/AT+ZSAEWJ0/nIawpLOshcazSXOTxV6gFCti4MsjqOnQVO+KCwJP4MwO6ir0HwndfXk7pAYEDMfpLoH2OM2+dJ55LaSM1vLgN1TraL9tUa/mHKB7zzLsgsL8AUgMIfSom2zYQotUNYhQK1tEjA2uRC8E0U9B8fmHZjmkhl7QkBubqx4HtIKSgd10qKqKiZzngBLKPQAsKQMIdCEukI1WaaDF0SxH+BYybi4YldYUaQOlMRGJvNTUYiseNY3BpN7zhpji11d2pCQekKi5Vg3FICGt3n0ZxaReLjGiZqCv2DCNUwcdAIuYIJVUlxBeo3YJpJT8Zx7PHwunITUPPNiPMAHnm3KmdEtVMRa0mElPt+qOtJy/8WuhFRINKpSzeBiJ3ZmS8ssWDGVe4EmGH0lEQN7rr5MZdwjC8ic26snWn0VRjFtSZGZGlUf2G0gipHSGJ+30s9RhM+k634R6DPY21a4TuKQYKX29IKAu1OoANAd7anqOt5d+UwMZy7UMLiFJZWkCdQuUQA7tQqUsJHzoFmjxdLvG0slhcjp/3LF4eVwj+lcbi8oRIXjmMDjAdPzMAxcUKLu7kEz4U1im5ZaKaEMa/e/gqCqASOKAAFn1wHMwQl9tJrsHEdUOVj4M2Yxug7Lq9FSHmNVGp+yU8Jf2YoURn3hGHqa7o3BEnnfGJTtVSQWXoHUNTc3Frnk5VDSNSIyCs/Z5k0k15yQtWgIvBOnuzkSBdnUGMMgVqmcw4ECHviNBFci8aSXug2s3PFSES/4iJRbSIqpmdkdKuJpgWZQXgA//otOI1qK+JxHZCBhUKpw9lMIJd8Qxr4poicquf0kH9i/Z50w0QC6FHmQgGB0/1WosiYaHGQYVI0ekoB/QJ/ito3lxRvrhCvWDFj5TzgXHAQ+oYuFh1TQUaKoGNzZ0wLoOhSg5iG8Fsv1Hfyhn1ljS/5wxxK6q2QQcA8II8CFJqs3JoWoIp4r2OV9AHNi7+y5Uqu9jVHQiYV+BDarP9gPparokkrSwDERTPxUzALyVzVm8L1c7pAjO36YbHdFu+1yIakMFzxloAW1OWcBc+dSVVh3lLTV4/8fmdzdVJ50suPAhd6PxiczSTg37gRBRwCAn+iTqGQ7KH4BhByfG209dRE4BdV5GIS6Qo2ElsSJHo61KdToLKUSQyTZcBXqXDyshHAJ7zvXDrDMCb+ngAl7RxoixWvRV2pKOVct6n0ZZaFLn4iMFF3ug3a0pPqbZIzo4M1I5IJqOUqRJaiazhUC0otlWpvfLRN4pQbxwh5gMSUPFkHviQwQBpRWgq/E5sXdCwG/mw8WVs/fJ5g105cD5vOyE2og/jiwOfRImSVsMC6AOet/AmSPaH65+ZRNmbS56YxIp2P8XDod4FEi71vouHU7+ram567h/46+OgVBbKe8jIEINUAgj4lUTCWPDZHFuoOhuB8F3htiUepeuG/LymvCasbjO24VL0u0KsT3xQwHIgQHopIWtsDFtqgqWXQJ2jLIXOChz7rub/VawLcqpn6BRfSWtwi1uCU6hXqbaQNWA5hSup6AM0uH0YWv2MokR4rsgVj1rVa5MDlpNlEymBwrBNaXZBKxR+OwsuDoT+VhJMYcFuWtnP+aYjeOYa9CUtXXf2uh76eCR1D0Zdv0Xj++cGPB2tk8Wf6qmzc0L/kf6fZcSQMtQAdRgMbR/GQnfVSnaond6ztO1wNlMTfJZIlkcWKWr+IcbVI8ifYlxQBzYCA6B//tcsBQZ16Oz8jESFAWtrFygFpOmwgUdHh+dsHpjn5kF7bh7EZxFw6wuop8ZAMQinNrw0W7chxFQFNYKkIOllInp5b22+QZ76iyxGi0mrkQqtGcQ27N4uUaz+XRWb9k14SSdHtW0+8uko8x4uOfLpqiEf/ig1U8tlHGJWFivNAkLuiQnjnEocRLcaCNJ0lZJyHdRoVzRB8ovje3zl+Ee5Lk2ob2RvP5D9xfVeEt2r38h+6dxsvnWgVoEp+kY6o2ntBK4IPRWOdNeuFiKp/2ghGhwczxbirUJWJwCuCrlyXakSzdlpizanusLMeqShC5lkWi2aULoY/sHv6kHwgog3ir8TvH1r3D61bYXv1FPn9hJ3ZX6urLkvhJpq6RBHdGaOAfHj9Qyvecqe2BzqJFqbYNVPlP+1BD3DXz3iP7zIy11dOpFNyN1Z0iLtgYMXPuHMJjHbY3KoYqWHbAQB/ZBDEPuU3kgn2MejPntbObrkiaT9d2xXV/DuB6YlTOpZa+URlZq1uxclaw8du0L8UrHqkrEvY1A7Iuk+4/UlWVb1VZ8Kv4Pkb22JE7H7M2JPamyDBaQlkwfCEdgukaJGyA/1IC2ZJaO+N1Xuhed7saN+LjyFMV4LqlVPbf6spg53L4T8mG1FwIDhwrZmsNdzVLzHVhDsC3KNuLbdQhukiNSp/cygq5lzKPqrRDsE/TntRzdHjIZHVVmtsLvSeaOtuzC7YWTG3UFbxgF55Q2EGaGhLm8geLKTqJRS1fXvvK0Xlb4sW93W7e2jq/rAoO0Jg/oDg55rclWJ4SEcA+LY1XvxPKivkps6vGnz1qfI/t6YC3o1KdRLl+JjO+1WpXxVpyr05zJlVVXwjKeS1LlA8D3LFq+BN6I7qvzH8vu5fLWvv97X/6RBiwjYq3166JGjxyld2pP+MPa9iyrM+dAkZhsBveZQrxGPmG6OXR3hJ2njIuMsqVFBdzXjodBacz/k+WXpvWF+6pfDuTsdPbz7uQvL+rokrK4U0Y4MHuRH7Ux5JNkvlXy0VVnyWtqOBNFlxXOTZZvPWyz90SrJj53Bvd+m/t47AG1IVtkCrRi9lJ4nBKGg5jG6S6Kj5f2QlRhbijeW/tKdfW7Oqg/dWWm339TOzeVPeudWZoXD2A/RI/1ZvbanKwaJhKZgDhzWW6dgtCMKBSzds6gFTptu9TnUvdGRR5uYxHdKA3gSO742Ov7y4oCvj20fKqJz22eviI5tn/pWx2v1t/2YhzSmQmbeWCBTSmEoVcFmV6WjkA01iU+yAyp6/Wt6fs5O9ZSerUjik/UU/J3qSbtbT7ju7xtEMLW7TRYZ7crOrfRAdaSFaYxADCvAHAWIc1SsiHq9d1f2/stnIbEIB3Cbyvgi+r5KXk4CaXZCgyzzYDJS0vZBQMVh9Xs56uZPe0fSHGIWtSdD0WLlJTaqu8qXkeCX3b6MsC5tf8lhoauDDZJaxx8203bD3navPzqP8pfSW96OUbKHEhrETJkDMIro+yC3xBYrCxFyrsme50ilyMSRq8R+ycoN3bK8OrTHfBEnPKt+2Ry+KaJhMdPZHBrRjb3oVub3Df+nz6u2eSmnmRFRukmXjEyVdtR6KQazQVA2DwJJyHNHFyDobB4JutwF96b+1lNjvRRV9WCU1oLAnojFroAfsxTQ4tqlgKxHARHeSCAL1ZKZiIEvzr1cq35MzWGl+YboyCU51lJt64d/twdoLvWmPuLmXT0+hNC2hDLR23TYJPgJ/0ANMACxoPrGNQzrJUsPiusE2MOmH3c63vY51HcJ8fsbLlt82EydXHmXQfdm1JMQ6tDzCtQYjS3SYQQmYPXUi0L4VaqaSi3Guf7Yj+lW9/a+wPWSVJptk11cqIlKpuCXKTt+TeLBAw3Mw6ENvpe29VmU3klM4Qwnzuii5Q0QxS9RF1cfK12ocb4j0Kz/0BIgJdW+Zm9/2kKUNzwoO33VJPgOpYjfIYVeoNCzmKorEITlL0SOXxD5G1KjT/BQ1ZlBp1RH0qSw0oGVwgqcXgZd9fVHnP5cCqrjq+ADUQ1O458Blq99ob/MVb18cU31mOk2Jd1Hi7IdIzi5cquKWi8bt5GXC0kFs799xTfQqLzj42ZDfOcUu5RbQfZJBOH63UHqxUPpB+8lEKvIa3UmDgNWN3szq9rtKsJyuH0HAgvu9rvZ9f38q1HVT1ZFnoj53iLgfv40qlpWvWxq4o9k5P1nMoLj1TsZ/YFSpDE65Q1DjP1/RpKctn95EN4AAAGEaUNDUElDQyBwcm9maWxlAAB4nH2RPUjDQBzFX1OlIhUHA4o4ZKhOFkRFHKWKRbBQ2gqtOphc+gVNGpIUF0fBteDgx2LVwcVZVwdXQRD8AHF1cVJ0kRL/lxRaxHhw3I939x537wChUWGa1TUHaLptpuIxKZtblUKvCEHEIMKYkJllJNKLGfiOr3sE+HoX5Vn+5/4cfWreYkBAIp5jhmkTbxDPbNoG531ikZVklficeNykCxI/cl3x+I1z0WWBZ4pmJjVPLBJLxQ5WOpiVTI14mjiiajrlC1mPVc5bnLVKjbXuyV8Yzusraa7THEEcS0ggCQkKaiijAhtRWnVSLKRoP+bjH3b9SXIp5CqDkWMBVWiQXT/4H/zu1ipMTXpJ4RjQ/eI4H6NAaBdo1h3n+9hxmidA8Bm40tv+agOY/SS93tYiR0D/NnBx3daUPeByBxh6MmRTdqUgTaFQAN7P6JtywMAt0Lvm9dbax+kDkKGulm+Ag0NgrEjZ6z7v7uns7d8zrf5+AM4Pcssy5aTwAAAABmJLR0QA/wD/AP+gvaeTAAAACXBIWXMAAAsTAAALEwEAmpwYAAAAB3RJTUUH5wcUFw0wINBmVgAACVJJREFUeNrtm32QVWUdxz9nl/c3AyReTORBQQQPmY6ZZaKShOjATDaiM5r5OjAmWhNTiDzGKZ2htCQpzag0DMxUJHFGB5UBSyAgkyeRTZfDiyKvMYCwLMvu6Y/zvXW5c7l7z7l37y7Vb+bO3Nm79zzn+Z7fy/f3fX4X/sfNa41FrTOeF0Gk1QM/jP5rAbDOtAf6AoP1MsDJQFcgAuqAfwJbgS3AJmAbcCDww6YTEgDrBnngDQS+BFwFnCMQOhVYMwKOAvsFxtvAa8AqIAz8sOGEAMA6cwZwM3ANMAioLuFyjcBOYAXwe2Bp4Ie72iQA1pmuwPXAt4ChLfCwGoC/A08AzwZ+uK3NAGCdGQj8QE+9YwuHbRPggDnAHwI/3NeqAFhnhgE/By6tcAJvAF4FAmBV2krSrgzx/gvg4gpu/AjwPvA34F2gl7zucEU9wDrTC/g1MKFCG28C3gB+BiwDdpejTHopN18NWGB6iVm+WKtXzM8K/HCXdaZKZfU0oA/QQR6wF6gN/HBHS4fA54DJFdp8I/AwMDPwwzrrzAitPQYYIPf3xCMagJXWmcmBH9aUxQOE9qlAu8APa60znYDfAV+pkOsvBr4W+OFe68xYgXFmM99ZBtwc+OHG5i5eVYjCWmcuAB4BXgGG66MLxPAqYbuAB7T583QvZxbxvVHAQ9aZPok9wDrjAZ8GpgDjgd7ABpW5nUpCkyoEwK+0VgdgXkKva1LemBr44ZGiPMA6czIwDXgRuEmbB1itzfcBLkm5mQg4oEZnt3h/IdsPPBn44VGBPzbhelXALSJnzYeAdeYsYIGIxadybvxNlZyhwMAUm/8QuF+hcyFwEXADsFRPKp+tAf5qnemgh9ElxbpdgRkia81WgS8Ao/OExRHgH3o/HOic8CbeBSYR8UYw8hi2VmOdeRWYKTevynHf5wI/PGidGVki0RoKTFVlOFIoBI6XEOvk/gCnJ+QOHwP3BH64PGfzGSFkt/jE0pyPdgKv6/0V0g9Ksa8eD8SqIqlnnZLjJxIu/GdVkONa4Id7RKez+/0VwEbrTHfpCaX2LD2AO60zXdIA4JVwAysDP6wr4v/eEovLEJ/n5a4jVZHKYZeJwCUGoD3QRd3WnoSL7i/y/+rkaUgSWx6rSkwAupcJgG7ADdaZdkkB6AL01/sNBbJ2Phts15livKdv1kYXAx+A1xcYV2ZeMVr9QyIAOgC+3q9L8FQBLsFjQDNU29NGexCLo/NVckcXyfqS2ADgi0kBALjUOtMRqFF9LtbOAqbou4Uaq9uUZxYDb1lnugFfL1WvyGPVwBh1s4kA+CwwPPDDQ8DcBOJDFXAnMNM6MyA7HKwznawzV6oCDBRZ+qnU3zHiJS1h50hEObYXsM7cDjxWIOPPAe4mlrbnAtcm5OXrVds3Kt4zjLCHSuA04Mei38/numoZ7QAwOvDD1Un1gGuBhYEfvm6dma7EOCqBJ5ytV5QDciQK/rj+fhvw+RZssLoQH9CsThICiI3db505XX32LcCzWeUrjQoVAc8B3wn88ABwubysJYWWajFakgKQSVhzBEIt8QHI7cCbwMGE16pT/N8R+OF29fsPAZ+sQJt9yn1x9UmVZcdKbLhOT+1J68wLYmwXKckMBvqJOnfOAToC3gEeBJ6RzHU+8CgwokI6Q8+m+Gg2SltmegKRykl/YHvgh8tjBmeqFWc99ZkRjxihMHpJtX6zdabaOjMemAUMo3LWwcNL7QEZ923UE/4tsN0687KI0jaRpa2BH24hPtx8WhS0Y+CHB7O0xvHAA8AQKmtRPj0gqdqSuVA/KTYTVWJ2qqaH1pn1os8bge3AvqwusEmgrQfOB76s7D+wBQhQvgfYVAoA3dUk1WvTGVBO0mtIlnTWkCWF1Vhn1opNblDo1OjvC7Ko6kTlk14tBMCezFFaVcoL9BEI9XHj0mw32Usc4Gq5/IvEpzzfVS9A4IeNgR9uDfxwvnS8cSJmO1oAgE1py2A2JzhFguWaFN/vqK5slJqtXJGkPvDDVUR8Q4LIfOBQmTbfANSWCkB34Fy9/1MKDkCWxNYnT4fY2TpzIR6dAj9cI9J1q5qxUm1fOQCoAsZq/medXmnb0/Py6QjAM8B868ypgR8eDvxwgXLDayUCECpJlwQAythDNKDwVEKhJFtrmCggs62fGOHFSqqZ0Hhb7POlEu57BdG/E3dJAPQDrhGlXChdL42NURnMla+q1WfU5eSHLcBdwMoUax0GXs5WqEsBwAOuj+CMwA8/An6UMlH1Br4tESQ7UUUCoX2eJFkL3EN8dpjENmS6wHIAkEliU8TyXiA+v0szqnIlcKvYIcTia70o9fEOOJdrvSTsb6HOIsoGAMRHXOMCP6wnPuVZkjIXTAeunrFukAd8RCyTdxJ/II8XNAK/EcMsxj4gHrWj3ACcJJ1ghEJhikpjGm4x2/O86ySO1ijMLsuVsrOsJsFaTwPvtQQA6Cn9RCWrRjX7lRTh0J944myqkmokbXDocbwgMynW3DrvAY/nmykqFwBIzXkkC4SbJHMdSuFR96rmRwLlxqz8kGvvNCPSHgXmBH74fqGurlw2AZhrnRmucLhbGt+6hN6QGcvJ3N+NwBXWmR55gNjZDBNdUihZlhuATF1fIMm7Qc3NVcAMlaHGFNfsSzySN0vA5Nb2IwWanvsCP9xbSQAgPtScB8yyzpwW+OFWL+4CL1d+WEQ8EV5fwDMyo/S1xENZk4B7Az/cnGcP+fbxsTa/utCNtqTw0JN4cHqsdeaxKOYJHwZ++IR1Zr5ieyjx8ZcRIcpoDLu18Q1KYDtU9vJZN5XL3Lh/mFhup7UAyLDFEcBs4A7gj9aZRVKBtuhpLlEH6EHkeZEXzRyZaO63H8dOrTQRT5T/sJjfGLQ0ANluOkyvycSzvmutM2skl+0EdgX+pjQj8MOyNIVI9X6aFOuitb1KWnfgM8oFjxIfiC4HJhd5lJ6tG1QTn1V4Sq5PAd/MpbttwQMKhUjm6f0lGJl45L239IQjwC+BGYUyflsEIGObgbUpvncusTT/PWC2Tq85EQFYlqCpybh/5sD1LuKRujT8ok0AcJh4KCqRohQReR7evCSj8W0VgHVp1J3v+5saKYNkXtXKm4+If/i0t7VuoLUB2EysJ7aatctpHBZR2d8TLyOWqVsfAM/zlvCf+dxKWdPMszc28X9rPfsXcYEXg5sPzkQAAAAASUVORK5CYII=".encode()
 
 
+# Command line options
+PARSER = ArgumentParser(description="Library Parrotex")
+PARSER.add_argument("--ingest",
+                    nargs="+",
+                    metavar="FILE",
+                    help="build an offline ISBN index from OpenLibrary "
+                    + "dumps (editions, authors) or JSON lines of editions")
+PARSER.add_argument("--bench",
+                    action="store_true",
+                    help="print how long the app took to show its window "
+                    + "and quit")
+ARGS = PARSER.parse_args()
+
 # Sets opening GUI theme
 sg.theme("DarkGreen4")
 
@@ -51,7 +76,6 @@ LANGUAGES = {
            "errFP": "Není doporučeno používat tento program v "
            + "zabezpečených/systémových složkách.\nPokud jej i přesto "
            + "chcete zde spustit, spusťte jej s administrátorskými právy.",
-           "errG": "Nelze načíst github.com",
            "up": "Je k dispozici nová verze.\n"
            + "Chcete otevřít stránky vývojáře?",
            "l": "Vyčkejte, prosím...\nVáš požadavek se právě zpracovává.",
@@ -61,14 +85,30 @@ LANGUAGES = {
            "fI": "kody",
            "fC": "karty",
            "fH": "pomoc",
+           "fJ": "denik",
+           "fU": "zmeny",
+           "fM": "udaje",
+           "fR": "opakovat",
+           "fO": "openlibrary",
+           "fV": "verze",
+           "fL": "historie",
            "m": "Domov",
            "mV": "Zobrazit:",
            "mA": "Vše",
+           "mU": "Nová verze",
            "a": "Přidat",
            "aQ": "Vyplňte údaje knihy:",
            "aL": "Načíst",
            "aF": "Vyhledat",
            "aS": "Úspěch! Kniha přidána jako #",
+           "aI": "Importovat",
+           "iF": "Soubor s ISBN:",
+           "iB": "Procházet",
+           "iT": "Seznamy ISBN",
+           "iS": "Spustit",
+           "iD": "Přidáno knih: ",
+           "iR": "Nezdařilo se, seznam v ",
+           "errI": "Soubor nelze přečíst.",
            "errA1": "Nelze navázat spojení s ISBN databází.",
            "errA2": "Nelze načíst databazeknih.cz",
            "errA3": "Bylo zadáno neplatné ISBN.",
@@ -83,7 +123,20 @@ LANGUAGES = {
            "cR": "Vrátit",
            "cM": "Spravovat",
            "cC": "Karta: ",
-           "cH": ["ID", "Název", "Datum"],
+           "cH": ["ID", "Název", "Datum", "Vrátit do"],
+           "cO": "Po termínu",
+           "oH": ["ID", "Název", "Karta", "Vrátit do"],
+           "oF": "Uložit do:",
+           "oE": "Exportovat",
+           "oD": "Uloženo: ",
+           "errO": "Soubor nelze uložit.",
+           "cY": "Historie",
+           "cD": "Rychlé výpůjčky",
+           "dS": "Naskenujte kartu nebo knihu:",
+           "yH": ["Datum", "Událost", "ID", "Název", "Karta"],
+           "yB": "Vypůjčena",
+           "yR": "Vrácena",
+           "yY": "Rok:",
            "errC1": "Musíte zvolit kartu.",
            "errC2": "Musíte zadat ID knihy.",
            "errC3": "Zadané ID nebylo nalezeno.",
@@ -94,15 +147,21 @@ LANGUAGES = {
            "cmN": "Jméno:",
            "cmC": "Zavřít",
            "cmY": "Chcete doopravdy smazat danou kartu?",
+           "cmP": "Výpůjční lhůta (dny):",
+           "cmS": "Nastavit",
            "errCM1": "Musíte zadat jméno karty.",
            "errCM2": "Karta již existuje.",
            "errCM3": "Karta neexistuje.",
            "errCM4": "Nelze smazat kartu s vypůjčenými knihami.",
+           "errCM5": "Lhůta musí být kladné celé číslo.",
            "h": "Legenda",
            "hS": "Uložit",
+           "hF": "Rychlé spuštění (bez úvodních oken)",
            "u": "Vrátit změnu",
-           "uQ": "Změnu čeho byste rádi odvolali?",
+           "uS": "Změny k vrácení / obnovení: ",
+           "r": "Obnovit změnu",
            "errU": "Žádná změna k zvrácení.",
+           "errR": "Žádná změna k obnovení.",
            "e": "Upravit",
            "eT": "Upravujete knihu #",
            "eE": "Upravit",
@@ -122,7 +181,6 @@ LANGUAGES = {
            "errFP": "It's not recommended to use this software in "
            + "protected/system folders.\nIf you still want to launch "
            + "it here, launch it with administrator privileges.",
-           "errG": "Couldn't load github.com",
            "up": "New version is available.\n"
            + "Would you like to open the developer's website?",
            "l": "Please, wait...\nYour request is being processed right now.",
@@ -133,14 +191,30 @@ LANGUAGES = {
            "fI": "ids",
            "fC": "cards",
            "fH": "help",
+           "fJ": "journal",
+           "fU": "changes",
+           "fM": "metadata",
+           "fR": "retry",
+           "fO": "openlibrary",
+           "fV": "version",
+           "fL": "history",
            "m": "Home",
            "mV": "View:",
            "mA": "All",
+           "mU": "New version",
            "a": "Add",
            "aQ": "Enter book details:",
            "aL": "Load",
            "aF": "Find",
            "aS": "Success! Book added as #",
+           "aI": "Import",
+           "iF": "File with ISBNs:",
+           "iB": "Browse",
+           "iT": "ISBN lists",
+           "iS": "Start",
+           "iD": "Books added: ",
+           "iR": "Failed, listed in ",
+           "errI": "Couldn't read the file.",
            "errA1": "Couldn't reach ISBN database.",
            "errA2": "Couldn't load openlibrary.org",
            "errA3": "Invalid ISBN has been entered.",
@@ -155,7 +229,20 @@ LANGUAGES = {
            "cR": "Return",
            "cM": "Manage",
            "cC": "Card: ",
-           "cH": ["ID", "Title", "Date"],
+           "cH": ["ID", "Title", "Date", "Due"],
+           "cO": "Overdue",
+           "oH": ["ID", "Title", "Card", "Due"],
+           "oF": "Save to:",
+           "oE": "Export",
+           "oD": "Saved: ",
+           "errO": "Couldn't write the file.",
+           "cY": "History",
+           "cD": "Rapid checkout",
+           "dS": "Scan a card or a book:",
+           "yH": ["Date", "Event", "ID", "Title", "Card"],
+           "yB": "Borrowed",
+           "yR": "Returned",
+           "yY": "Year:",
            "errC1": "You have to select a card.",
            "errC2": "You have to enter the book ID.",
            "errC3": "Entered ID couldn't be found.",
@@ -166,15 +253,21 @@ LANGUAGES = {
            "cmN": "Name:",
            "cmC": "Close",
            "cmY": "Are you sure you want to delete the selected card?",
+           "cmP": "Loan period (days):",
+           "cmS": "Set",
            "errCM1": "You have to enter the card name.",
            "errCM2": "This card already exists.",
            "errCM3": "This card doesn't exist.",
            "errCM4": "You can't delete a card with borrowed books.",
+           "errCM5": "The period has to be a positive whole number.",
            "h": "Key",
            "hS": "Save",
+           "hF": "Fast start (no splash screens)",
            "u": "Undo",
-           "uQ": "Which one would you like to undo?",
+           "uS": "Changes to undo / redo: ",
+           "r": "Redo",
            "errU": "Nothing to undo.",
+           "errR": "Nothing to redo.",
            "e": "Edit",
            "eT": "Editing book #",
            "eC": "Cancel",
@@ -202,7 +295,7 @@ except PermissionError:
            [sg.P(),
             sg.B("OK", k="OK")]]
     title = msg[0:(msg.find(":"))]
-    pWin = sg.Window(title, pLO, icon=ICON)
+    pWin = sg.Window(title, pLO, icon=ICON, modal=True)
     pEv, pVal = pWin.read()
     pWin.close()
 
@@ -225,18 +318,98 @@ if LNG == "":
             f.close()
 
 
+# Settings kept across launches
+try:
+    with open("config.json", "r", encoding="utf-8") as f:
+        CONFIG = jload(f)
+        f.close()
+except (OSError, ValueError):
+    CONFIG = {}
+CONFIG.setdefault("fast", False)
+CONFIG.setdefault("period", 30)
+CONFIG.setdefault("cards", {})
+CONFIG.setdefault("locations", {})
+
+
 # List of global constants
 LANG = LANGUAGES[LNG]
-ROWS = []
+INDEX = {}
+TOKENS = {2: {}, 3: {}, 4: {}}
+GRAMS = {2: {}, 3: {}, 4: {}}
 FIELDS = []
 IDS = {}
 CARDS = {}
+LOANS = {}
+DUE = []
+HISTORY_MAX = 5000
+SEGMENT = 0
+ARCHIVE = {"books": {}, "cards": {}}
+RECENT = {"books": {}, "cards": {}}
+OFFSETS = []
 HELP = ""
 SORT = 0
+REVERSE = False
 LAST_LOC = ""
 VERSION = "v2.2.1"
-WINDOW = "m"
-CHANGED = True
+STAMPS = {}
+KEPT = True
+PERMS = {}
+JOURNAL = 0
+JOURNAL_MAX = 500
+UNDO_MAX = 100
+UNDO = deque(maxlen=UNDO_MAX)
+REDO = []
+STEPS = 0
+META = {}
+META_MAX = 5000
+META_TTL = 30 * 24 * 3600
+META_MISS = 24 * 3600
+TIMEOUT = (3.05, 10)
+DEADLINE = 15
+POOL = ThreadPoolExecutor(max_workers=8)
+BULK = ThreadPoolExecutor(max_workers=2)
+WRITER = ThreadPoolExecutor(max_workers=1)
+DESK = Lock()
+PENDING = []
+FLUSHES = []
+GROUP = 0.2
+LOCK = Lock()
+RATES = {"www.googleapis.com": 0.25,
+         "openlibrary.org": 0.5,
+         "en.wikipedia.org": 0.5,
+         "www.databazeknih.cz": 1}
+PROVIDERS = {"goob": ("www.googleapis.com",
+                      ("title", "authors"),
+                      ("cs", "en")),
+             "openl": ("openlibrary.org",
+                       ("title", "authors"),
+                       ("cs", "en")),
+             "wiki": ("en.wikipedia.org",
+                      ("title", "authors"),
+                      ("cs", "en")),
+             "ol": ("openlibrary.org",
+                    ("title", "authors", "subjects"),
+                    ("en",)),
+             "dbk": ("www.databazeknih.cz",
+                     ("subjects",),
+                     ("cs",))}
+LATENCY = {}
+HEDGE = 1
+ALPHA = 0.3
+WAKE = 0.25
+NEXT = {}
+RELEASES = ("https://api.github.com/repos/ftedianiak/library-parrotex/"
+            + "releases?per_page=1")
+RELEASES_TTL = 24 * 3600
+RELEASES_TIMEOUT = (2, 3)
+OFFLINE = None
+INGEST_BATCH = 10000
+CHUNK = 8192
+LIBS = Lock()
+SESSION = None
+IMPORT_BUDGET = 0.5
+isbn = None
+requests = None
 
 
 # Defines pop-up windows
@@ -256,12 +429,45 @@ def Popups(tip: str, msg: str) -> str:
                 sg.B(LANG["ok"], k="OK")]]
         title = msg[0:(msg.find(":"))]
 
-    pWin = sg.Window(title, pLO, icon=ICON)
+    pWin = sg.Window(title, pLO, icon=ICON, modal=True)
     pEv, pVal = pWin.read()
     pWin.close()
     return pEv
 
 
+def online() -> None:
+    """
+    Imports isbnlib and requests on first use.
+    @ isbn, requests, SESSION
+
+    - Most sessions never look a book up, so launching doesn't pay for
+      them
+    - Sets up SESSION, which keeps connections to each site open
+    """
+    global isbn, requests, SESSION
+
+    with LIBS:
+        if SESSION is None:
+            import isbnlib as isbn
+            import requests
+
+            isbn.config.seturlopentimeout(TIMEOUT[1])
+            _session = requests.Session()
+            _session.mount("https://",
+                           requests.adapters.HTTPAdapter(pool_maxsize=8))
+            SESSION = _session
+
+
+def browse(url: str) -> None:
+    """
+    Opens a page in the web browser, importing webbrowser on first use.
+    < URL
+    """
+    import webbrowser
+
+    webbrowser.open(url)
+
+
 def Loading() -> sg.Window:
     pLO = [[sg.T(LANG["l"])]]
     pWin = sg.Window("",
@@ -274,6 +480,16 @@ def Loading() -> sg.Window:
     return pWin
 
 
+# Finishes saves interrupted between their renames
+for _file in ((LANG["fB"] + ".csv"), (LANG["fI"] + ".json"),
+              (LANG["fC"] + ".json"), (LANG["fH"] + ".txt"),
+              (LANG["fJ"] + ".log"), (LANG["fU"] + ".log"),
+              (LANG["fM"] + ".json"), (LANG["fV"] + ".json"),
+              (LANG["fL"] + ".idx")):
+    if not os.path.exists(_file) and os.path.exists(_file + ".tmp"):
+        os.replace((_file + ".tmp"), _file)
+
+
 # Creates necessary files on first launch
 try:
     with open((LANG["fB"] + ".csv"), "x", encoding="utf-8") as f:
@@ -306,843 +522,2032 @@ try:
 except FileExistsError:
     pass
 
-
-def load() -> None:
-    """
-    (Re)Loads all constants.
-    @ ROWS, FIELDS, IDS, CARDS, HELP
-
-    - Loads data from books.csv, ids.json, cards.json and help.txt
-    - Sorts ROWS
-    """
-    global ROWS, FIELDS, IDS, CARDS, HELP
-    ROWS = []
-    FIELDS = []
-    IDS = {}
-    CARDS = {}
-    HELP = ""
-
-    with open((LANG["fB"] + ".csv"), "r", encoding="utf-8") as f:
-        _raw = cread(f)
-        FIELDS = next(_raw)
-        for _row in _raw:
-            if _row != []:
-                ROWS.append(_row)
+try:
+    with open((LANG["fJ"] + ".log"), "x", encoding="utf-8") as f:
         f.close()
+except FileExistsError:
+    pass
 
-    with open((LANG["fI"] + ".json"), "r", encoding="utf-8") as f:
-        IDS = jload(f)
+try:
+    with open((LANG["fU"] + ".log"), "x", encoding="utf-8") as f:
         f.close()
+except FileExistsError:
+    pass
 
-    with open((LANG["fC"] + ".json"), "r", encoding="utf-8") as f:
-        CARDS = jload(f)
+try:
+    with open((LANG["fM"] + ".json"), "x", encoding="utf-8") as f:
+        jdump({}, f)
         f.close()
+except FileExistsError:
+    pass
 
-    with open((LANG["fH"] + ".txt"), "r", encoding="utf-8") as f:
-        HELP = f.read()
+try:
+    with open((LANG["fL"] + ".idx"), "x", encoding="utf-8") as f:
+        jdump({"segments": 0, "books": {}, "cards": {}}, f)
         f.close()
+except FileExistsError:
+    pass
 
-    for i in reversed((SORT, 0)):
-        ROWS = sorted(ROWS, key=operator.itemgetter(i))
 
+def stamp(file: str) -> tuple:
+    """
+    Returns the on-disk identity of a file.
+    < File
 
-def main() -> None:
+    - Made of mtime, size and inode, so any external edit changes it
     """
-    The Main Window.
-    @ WINDOW, SORT, CHANGED
-    # page, num
+    _st = os.stat(file)
+    return (_st.st_mtime_ns, _st.st_size, _st.st_ino)
 
-    - Prepares Main Window
+
+def changed(file: str) -> bool:
+    """
+    Checks whether a file has changed since it was last loaded or saved.
+    @ STAMPS
+    < File
     """
-    global WINDOW, SORT, CHANGED, page, num
+    _stamp = stamp(file)
+    if STAMPS.get(file) == _stamp:
+        return False
+    STAMPS[file] = _stamp
+    return True
+
+
+def tokenize(text: str) -> set:
+    """
+    Splits text into lower-case search tokens.
+    < Text
+    """
+    return set(re.findall(r"\w+", text.lower()))
+
+
+def trigrams(text: str) -> set:
+    """
+    Splits text into its lower-case three letter substrings.
+    < Text
+    """
+    text = text.lower()
+    return set(text[i:i+3] for i in range(0, len(text) - 2))
+
+
+def reindex(old: list, new: list) -> None:
+    """
+    Moves a book in its indexes from its old row to its new one.
+    < Old row or None, New row or None
+
+    - INDEX maps book IDs to rows
+    - TOKENS and GRAMS map each token and trigram of Author, Title
+      and Subject to book IDs
+    - PERMS hold sort permutations of the columns sorted so far
+    - Columns that stay the same are skipped
+    """
+    _same = old is not None and new is not None and old[0] == new[0]
+
+    if old is not None:
+        INDEX.pop(old[0], None)
+    if new is not None:
+        INDEX[new[0]] = new
+
+    for i in TOKENS:
+        if _same and old[i] == new[i]:
+            continue
+        if old is not None:
+            for _idx, _keys in ((TOKENS[i], tokenize(old[i])),
+                                (GRAMS[i], trigrams(old[i]))):
+                for _key in _keys:
+                    _ids = _idx.get(_key)
+                    if _ids is not None:
+                        _ids.discard(old[0])
+                        if len(_ids) == 0:
+                            _idx.pop(_key)
+        if new is not None:
+            for _idx, _keys in ((TOKENS[i], tokenize(new[i])),
+                                (GRAMS[i], trigrams(new[i]))):
+                for _key in _keys:
+                    _idx.setdefault(_key, set()).add(new[0])
+
+    for i in PERMS:
+        if _same and old[i] == new[i]:
+            continue
+        if old is not None:
+            _key = sortkey(old, i)
+            _at = bisect_left(PERMS[i], _key)
+            if _at < len(PERMS[i]) and PERMS[i][_at] == _key:
+                PERMS[i].pop(_at)
+        if new is not None:
+            insort(PERMS[i], sortkey(new, i))
+
+
+def idkey(id: str) -> tuple:
+    """
+    Returns the natural sort key of a book ID.
+    < Book ID
+
+    - A9 sorts before A10 without padding the number
+    """
+    if id[1:].isdigit():
+        return (id[:1], int(id[1:]), "")
+    return (id[:1], -1, id[1:])
+
+
+def normid(id: str) -> str:
+    """
+    Strips the padding off a book ID, e.g. A007 to A7.
+    < Book ID
+    """
+    if id[1:].isdigit():
+        return id[:1] + str(int(id[1:]))
+    return id
+
+
+def sortkey(row: list, col: int) -> tuple:
+    """
+    Returns the key a row is sorted by in a column.
+    < Row, Column
+
+    - Equal values are ordered by ID, and the ID itself comes last
+    """
+    if col == 0:
+        return (idkey(row[0]), (), row[0])
+    return (row[col], idkey(row[0]), row[0])
+
+
+def order(col: int) -> list:
+    """
+    Returns the sort permutation of books by a column.
+    @ PERMS
+    < Column
+
+    - Holds sortkey() tuples of the rows
+    - Built on first use, afterwards kept up to date by reindex()
+    """
+    if col not in PERMS:
+        PERMS[col] = sorted(sortkey(_row, col) for _row in INDEX.values())
+    return PERMS[col]
 
-    if CHANGED:
-        page = 0
-        num = 30
-        CHANGED = False
 
-    if num == -1:
-        start = 0
-        end = len(ROWS)
-        final = 0
+def matches(col: int, text: str) -> set:
+    """
+    Returns IDs of books whose column contains text.
+    < Column, Lower-case text
+
+    - Intersects trigram postings, from the smallest one
+    - Text shorter than a trigram is looked up among TOKENS
+    - Candidates are then verified, as trigrams don't keep their order
+    """
+    _cands = set()
+    if len(text) >= 3:
+        _sets = []
+        for _gram in trigrams(text):
+            _sets.append(GRAMS[col].get(_gram, set()))
+        _sets.sort(key=len)
+        _cands = set(_sets[0])
+        for _ids in _sets[1:]:
+            if len(_cands) == 0:
+                break
+            _cands &= _ids
+    elif re.fullmatch(r"\w+", text):
+        for _tok in TOKENS[col]:
+            if text in _tok:
+                _cands |= TOKENS[col][_tok]
     else:
-        start = 0 + (num * page)
-        end = num + (num * page)
-        final = ceil(len(ROWS)/num)-1
-
-    mLO = [[sg.P(),
-            sg.B("[" + LANG["m"] + "]"),
-            sg.B(LANG["a"], k="Add"),
-            sg.B(LANG["s"], k="Search"),
-            sg.B(LANG["c"], k="Cards"),
-            sg.B(LANG["h"], k="Help"),
-            sg.B(LANG["u"], k="Undo"),
-            sg.P()],
-           [sg.P(),
-            sg.T(LANG["mV"]),
-            sg.DD([30, 60, 90, 120, LANG["mA"]],
-                  num,
-                  k="Num",
-                  enable_events=True)],
-           [sg.Table(values=ROWS[start:end],
-                     headings=FIELDS,
-                     auto_size_columns=True,
-                     max_col_width=30,
-                     justification="center",
-                     num_rows=30,
-                     enable_click_events=True,
-                     alternating_row_color="#a0ca6d",
-                     k="Table")],
-           [sg.B("<<", k="Start"),
-            sg.B("<", k="Prev"),
-            sg.P(),
-            sg.B("[" + str(page+1) + "/" + str(final+1) + "]"),
-            sg.P(),
-            sg.B(">", k="Next"),
-            sg.B(">>", k="End")]]
-    mWin = sg.Window(LANG["name"], mLO, icon=ICON)
-    mEv, mVal = mWin.read()
+        _cands = set(INDEX)
+
+    _hits = set()
+    for _id in _cands:
+        if text in INDEX[_id][col].lower():
+            _hits.add(_id)
+    return _hits
+
+
+def period(card: str, loc: str) -> int:
+    """
+    Returns for how many days a card may borrow a book.
+    < Card, Location of the book
 
-    mWin.close()
-    if mEv is None:
-        WINDOW = ""
+    - A period set for the card wins over one set for the location's
+      abbreviation, CONFIG["period"] is used otherwise
+    """
+    if card in CONFIG["cards"]:
+        return CONFIG["cards"][card]
+    return CONFIG["locations"].get(loc[0:1], CONFIG["period"])
+
+
+def lend(card: str, entry: list, added: bool) -> None:
+    """
+    Adds or removes a loan in LOANS and DUE.
+    < Card, Loan, Added
+
+    - DUE is kept sorted by due date, so overdue loans are its head
+    - Loans of older versions have no due date until migrate() adds it
+    """
+    if added:
+        LOANS[entry[0]] = (card, entry)
     else:
-        if mVal["Num"] != num:
-            page = 0
+        LOANS.pop(entry[0], None)
 
-        if mVal["Num"] == LANG["mA"]:
-            num = -1
+    if type(entry[-1]) == int:
+        _key = (entry[-1], entry[0])
+        if added:
+            insort(DUE, _key)
         else:
-            try:
-                num = int(mVal["Num"])
-            except TypeError:
-                pass
-            except ValueError:
-                pass
+            i = bisect_left(DUE, _key)
+            if i < len(DUE) and DUE[i] == _key:
+                del DUE[i]
 
-    if mEv == "Add":
-        WINDOW = "a"
-        CHANGED = True
-    if mEv == "Search":
-        WINDOW = "s"
-        CHANGED = True
-    if mEv == "Cards":
-        WINDOW = "c"
-        CHANGED = True
-    if mEv == "Help":
-        WINDOW = "h"
-    if mEv == "Undo":
-        WINDOW = "u"
-    if mEv == "Start":
-        page = 0
-    if mEv == "Prev" and page != 0:
-        page -= 1
-    if mEv == "Next" and page != final:
-        page += 1
-    if mEv == "End":
-        page = final
-    if type(mEv) == tuple:
-        if mEv[2][0] == -1 and mEv[2][1] != -1:
-            SORT = mEv[2][1]
-        elif mEv[2][0] is not None:
-            if num == -1:
-                edit(mEv[2][0])
+
+def reloan() -> None:
+    """
+    Rebuilds LOANS and DUE from the cards.
+    @ LOANS, DUE
+    """
+    global LOANS, DUE
+
+    LOANS = {}
+    DUE = []
+    for _card in CARDS["LIST"]:
+        for _entry in CARDS[_card]:
+            lend(_card, _entry, True)
+
+
+def apply(ops: list) -> None:
+    """
+    Applies a change to the constants in memory.
+    @ HELP
+    < Ops
+
+    - Available ops, each holding its new and old value:
+      - ["s", row, old row or None] - adds or replaces the book with row's ID
+      - ["d", ID, old row] - deletes the book with the ID
+      - ["i", abbr, num or None, old num or None] - sets the ID counter
+      - ["c", card, entries or None, old entries or None] - sets a card
+      - ["l", card, [ID, date, due], added] - adds or removes a loan of a
+        card, due is an ordinal of the day
+      - ["h", text, old text] - sets the key
+    - Keeps LOANS and DUE in step with the cards, as the State column of
+      a book changes in the same change as its loan
+    """
+    global HELP
+
+    for op in ops:
+        if op[0] == "s":
+            reindex(INDEX.get(op[1][0]), op[1])
+        elif op[0] == "d":
+            reindex(INDEX.get(op[1]), None)
+        elif op[0] == "i":
+            if op[2] is None:
+                IDS.pop(op[1], None)
             else:
-                _row = mEv[2][0] + (num * page)
-                edit(_row)
+                IDS[op[1]] = op[2]
+        elif op[0] == "c":
+            for _entry in CARDS.get(op[1], []):
+                lend(op[1], _entry, False)
+            if op[2] is None:
+                CARDS["LIST"].remove(op[1])
+                CARDS.pop(op[1])
+            else:
+                if op[1] not in CARDS["LIST"]:
+                    CARDS["LIST"].append(op[1])
+                CARDS[op[1]] = list(op[2])
+                for _entry in CARDS[op[1]]:
+                    lend(op[1], _entry, True)
+        elif op[0] == "l":
+            if op[3]:
+                CARDS[op[1]].append(op[2])
+            else:
+                CARDS[op[1]].remove(op[2])
+            lend(op[1], op[2], op[3])
+        elif op[0] == "h":
+            HELP = op[1]
 
 
-def save(files: str) -> None:
+def inverse(ops: list) -> list:
     """
-    Saves and Backups selected files.
-    < Files
+    Returns the ops that revert given ops.
+    < Ops
+    """
+    _inv = []
+    for op in reversed(ops):
+        if op[0] == "s" and op[2] is None:
+            _inv.append(["d", op[1][0], op[1]])
+        elif op[0] == "s":
+            _inv.append(["s", op[2], op[1]])
+        elif op[0] == "d":
+            _inv.append(["s", op[2], None])
+        elif op[0] in ("i", "c"):
+            _inv.append([op[0], op[1], op[3], op[2]])
+        elif op[0] == "l":
+            _inv.append(["l", op[1], op[2], not op[3]])
+        elif op[0] == "h":
+            _inv.append(["h", op[2], op[1]])
+    return _inv
 
-    - Available files:
-      - b - LANG["fB"].csv + LANG["fI"].json
-      - c - LANG["fC"].json
-      - h - LANG["fH"].txt
+
+def load() -> None:
     """
-    if "b" in files:
-        _old_fields = []
-        _old_rows = []
+    (Re)Loads constants whose files have changed.
+    @ INDEX, TOKENS, GRAMS, PERMS, FIELDS, IDS, CARDS, HELP, JOURNAL
+    @ UNDO, REDO, STEPS, META, SEGMENT, ARCHIVE, RECENT, OFFSETS
+
+    - Loads data from books.csv, ids.json, cards.json, help.txt and
+      metadata.json only on first launch or after they've been edited
+      outside the app
+    - Replays journal.log over books.csv, ids.json and cards.json
+    - Indexes books by ID, tokens and trigrams, and loans by book ID
+      - Search indexes are kept in books.idx and only rebuilt after
+        books.csv has been changed outside the app or the app didn't
+        exit cleanly
+    - Migrates padded IDs of older versions
+    - Rebuilds undo and redo steps from changes.log
+    - Loads the index of the archived history and indexes the active
+      segment of it
+    """
+    global INDEX, TOKENS, GRAMS, PERMS, FIELDS, IDS, CARDS, HELP, JOURNAL
+    global UNDO, REDO, STEPS, META, SEGMENT, ARCHIVE, RECENT, OFFSETS
+
+    _books = [changed(LANG["fB"] + ".csv"),
+              changed(LANG["fI"] + ".json"),
+              changed(LANG["fC"] + ".json"),
+              changed(LANG["fJ"] + ".log")]
+    if True in _books:
+        INDEX = {}
+        TOKENS = {2: {}, 3: {}, 4: {}}
+        GRAMS = {2: {}, 3: {}, 4: {}}
+        PERMS = {}
+        FIELDS = []
+        JOURNAL = 0
+        _torn = False
+
+        _cached = False
+        try:
+            with open((LANG["fB"] + ".idx"), "r", encoding="utf-8") as f:
+                _idx = jload(f)
+                f.close()
+        except (FileNotFoundError, ValueError):
+            pass
+        else:
+            if _idx["stamp"] == list(STAMPS[LANG["fB"] + ".csv"]):
+                for i in TOKENS:
+                    for _tok, _ids in _idx["tokens"][str(i)].items():
+                        TOKENS[i][_tok] = set(_ids)
+                    for _gram, _ids in _idx["grams"][str(i)].items():
+                        GRAMS[i][_gram] = set(_ids)
+                _cached = True
 
         with open((LANG["fB"] + ".csv"), "r", encoding="utf-8") as f:
             _raw = cread(f)
-            _old_fields = next(_raw)
+            FIELDS = next(_raw)
             for _row in _raw:
-                _old_rows.append(_row)
+                if _row == []:
+                    pass
+                elif _cached:
+                    INDEX[_row[0]] = _row
+                else:
+                    reindex(None, _row)
             f.close()
 
-        with open((LANG["fB"] + ".csv.bak"), "w", encoding="utf-8") as f:
-            _wrt = cwrite(f)
-            _wrt.writerow(_old_fields)
-            _wrt.writerows(_old_rows)
+        with open((LANG["fI"] + ".json"), "r", encoding="utf-8") as f:
+            IDS = jload(f)
             f.close()
 
-        with open((LANG["fB"] + ".csv"), "w", encoding="utf-8") as f:
-            _wrt = cwrite(f)
-            _wrt.writerow(FIELDS)
-            _wrt.writerows(ROWS)
+        with open((LANG["fC"] + ".json"), "r", encoding="utf-8") as f:
+            CARDS = jload(f)
             f.close()
 
-        _old_ids = {}
+        reloan()
 
-        with open((LANG["fI"] + ".json"), "r", encoding="utf-8") as f:
-            _old_ids = jload(f)
-            f.close()
+        if not _cached:
+            keep()
 
-        with open((LANG["fI"] + ".json.bak"), "w", encoding="utf-8") as f:
-            jdump(_old_ids, f)
+        with open((LANG["fJ"] + ".log"), "r", encoding="utf-8") as f:
+            for _line in f:
+                if not _line.endswith("\n"):
+                    # Last line cut short by a crash
+                    _torn = True
+                    break
+                apply(jloads(_line))
+                JOURNAL += 1
             f.close()
 
-        with open((LANG["fI"] + ".json"), "w", encoding="utf-8") as f:
-            jdump(IDS, f)
-            f.close()
-    if "c" in files:
-        _old_cards = {}
+        if _torn:
+            save("b")
 
-        with open((LANG["fC"] + ".json"), "r", encoding="utf-8") as f:
-            _old_cards = jload(f)
+    if changed(LANG["fH"] + ".txt"):
+        with open((LANG["fH"] + ".txt"), "r", encoding="utf-8") as f:
+            HELP = f.read()
             f.close()
 
-        with open((LANG["fC"] + ".json.bak"), "w", encoding="utf-8") as f:
-            jdump(_old_cards, f)
+    if changed(LANG["fM"] + ".json"):
+        with open((LANG["fM"] + ".json"), "r", encoding="utf-8") as f:
+            try:
+                META = jload(f)
+            except ValueError:
+                META = {}
             f.close()
 
-        with open((LANG["fC"] + ".json"), "w", encoding="utf-8") as f:
-            jdump(CARDS, f)
+    _recent = False
+    if changed(LANG["fL"] + ".idx"):
+        with open((LANG["fL"] + ".idx"), "r", encoding="utf-8") as f:
+            _idx = jload(f)
             f.close()
-    if "h" in files:
-        _old_help = ""
-
-        with open((LANG["fH"] + ".txt"), "r", encoding="utf-8") as f:
-            _old_help = f.read()
+        SEGMENT = _idx["segments"]
+        ARCHIVE = {"books": _idx["books"], "cards": _idx["cards"]}
+        _recent = True
+
+        # Segment already archived before a crash
+        _log = LANG["fL"] + "." + str(SEGMENT - 1) + ".log"
+        if SEGMENT > 0 and os.path.exists(_log):
+            os.remove(_log)
+
+    _log = LANG["fL"] + "." + str(SEGMENT) + ".log"
+    if not os.path.exists(_log):
+        open(_log, "a", encoding="utf-8").close()
+    if changed(_log) or _recent:
+        RECENT = {"books": {}, "cards": {}}
+        OFFSETS = []
+        _at = 0
+        with open(_log, "rb") as f:
+            for _line in f:
+                if not _line.endswith(b"\n"):
+                    break
+                remember(jloads(_line), _at)
+                _at += len(_line)
             f.close()
 
-        with open((LANG["fH"] + ".txt.bak"), "w", encoding="utf-8") as f:
-            f.write(_old_help)
+        # Last event cut short by a crash, the next one starts in its place
+        if os.path.getsize(_log) != _at:
+            os.truncate(_log, _at)
+            STAMPS[_log] = stamp(_log)
+
+    if True in _books:
+        migrate()
+
+    if changed(LANG["fU"] + ".log"):
+        UNDO = deque(maxlen=UNDO_MAX)
+        REDO = []
+        STEPS = 0
+
+        _torn = False
+        with open((LANG["fU"] + ".log"), "r", encoding="utf-8") as f:
+            for _line in f:
+                if not _line.endswith("\n"):
+                    # Last step cut short by a crash
+                    _torn = True
+                    break
+                _step = jloads(_line)
+                STEPS += 1
+                if _step[0] == "p":
+                    UNDO.append(_step[1])
+                    REDO = []
+                elif _step[0] == "u" and len(UNDO) != 0:
+                    REDO.append(UNDO.pop())
+                elif _step[0] == "r" and REDO != []:
+                    UNDO.append(REDO.pop())
             f.close()
 
-        with open((LANG["fH"] + ".txt"), "w", encoding="utf-8") as f:
-            f.write(HELP)
-            f.close()
+        if _torn:
+            rewind(UNDO, REDO)
 
 
-def undo() -> None:
+def remember(event: list, at: int) -> None:
     """
-    Undoes one modification to selected file.
-    @ WINDOW, CHANGED
+    Indexes an event of the active history segment.
+    < Event, Its offset in the segment
 
-    - Available files:
-      - b - books.csv + ids.json
-      - c - cards.json
-      - h - help.txt
-    """
-    global WINDOW, CHANGED
-
-    uLO = [[sg.P(),
-            sg.B(LANG["m"], k="Main"),
-            sg.B(LANG["a"], k="Add"),
-            sg.B(LANG["s"], k="Search"),
-            sg.B(LANG["c"], k="Cards"),
-            sg.B(LANG["h"], k="Help"),
-            sg.B("[" + LANG["u"] + "]"),
-            sg.P()],
-           [sg.T(LANG["uQ"]),
-            sg.P(),
-            sg.B(LANG["fB"].capitalize(), k="b"),
-            sg.B(LANG["fC"].capitalize(), k="c"),
-            sg.B(LANG["h"], k="h")]]
-    uWin = sg.Window(LANG["name"], uLO, icon=ICON)
-    uEv, uVal = uWin.read()
-
-    uWin.close()
-    if uEv is None:
-        WINDOW = ""
-    elif uEv == "Main":
-        WINDOW = "m"
-        CHANGED = True
-    elif uEv == "Add":
-        WINDOW = "a"
-        CHANGED = True
-    elif uEv == "Search":
-        WINDOW = "s"
-        CHANGED = True
-    elif uEv == "Cards":
-        WINDOW = "c"
-        CHANGED = True
-    elif uEv == "Help":
-        WINDOW = "h"
-    else:
-        file = uEv
-        pWin = Loading()
+    - RECENT points from books and cards to rows of events, OFFSETS
+      from rows to where they start
+    """
+    _ref = [SEGMENT, len(OFFSETS)]
+    OFFSETS.append(at)
+    RECENT["books"].setdefault(event[2], []).append(_ref)
+    RECENT["cards"].setdefault(event[3], []).append(_ref)
 
-        try:
-            if file == "b":
-                _new_fields = []
-                _new_rows = []
-
-                with open((LANG["fB"] + ".csv.bak"),
-                          "r", encoding="utf-8") as f:
-                    _raw = cread(f)
-                    _new_fields = next(_raw)
-                    for _row in _raw:
-                        _new_rows.append(_row)
-                    f.close()
 
-                with open((LANG["fB"] + ".csv.bak"),
-                          "w", encoding="utf-8") as f:
-                    _wrt = cwrite(f)
-                    _wrt.writerow(FIELDS)
-                    _wrt.writerows(ROWS)
-                    f.close()
+def record(ops: list) -> None:
+    """
+    Appends the borrows and returns of a change to the history.
+    < Ops
 
-                with open((LANG["fB"] + ".csv"),
-                          "w", encoding="utf-8") as f:
-                    _wrt = cwrite(f)
-                    _wrt.writerow(_new_fields)
-                    _wrt.writerows(_new_rows)
-                    f.close()
+    - Events are [day, "b" or "r", ID, card], the day being an ordinal
+    - The history is split in segments of HISTORY_MAX events, a full
+      segment gets archived by seal()
+    """
+    _events = []
+    for op in ops:
+        if op[0] == "l":
+            if op[3]:
+                _kind = "b"
+            else:
+                _kind = "r"
+            _events.append([date.today().toordinal(), _kind, op[2][0],
+                            op[1]])
 
-                _new_ids = {}
+    if _events == []:
+        return
 
-                with open((LANG["fI"] + ".json.bak"),
-                          "r", encoding="utf-8") as f:
-                    _new_ids = jload(f)
-                    f.close()
+    _log = LANG["fL"] + "." + str(SEGMENT) + ".log"
+    _at = os.path.getsize(_log)
+    append(_log, *_events)
+    for _event in _events:
+        remember(_event, _at)
+        _at += len((jdumps(_event, ensure_ascii=False) + "\n").encode())
 
-                with open((LANG["fI"] + ".json.bak"),
-                          "w", encoding="utf-8") as f:
-                    jdump(IDS, f)
-                    f.close()
+    if len(OFFSETS) >= HISTORY_MAX:
+        seal()
 
-                with open((LANG["fI"] + ".json"),
-                          "w", encoding="utf-8") as f:
-                    jdump(_new_ids, f)
-                    f.close()
-            if file == "c":
-                _new_cards = {}
 
-                with open((LANG["fC"] + ".json.bak"),
-                          "r", encoding="utf-8") as f:
-                    _new_cards = jload(f)
-                    f.close()
+def seal() -> None:
+    """
+    Archives the active segment of the history and starts a new one.
+    @ SEGMENT, RECENT, OFFSETS
 
-                with open((LANG["fC"] + ".json.bak"),
-                          "w", encoding="utf-8") as f:
-                    jdump(CARDS, f)
-                    f.close()
+    - The archive keeps every field as a column, so it's loaded without
+      parsing a line per event
+    - Rows stay the same, so references of RECENT move to ARCHIVE as
+      they are, which is saved into history.idx
+    """
+    global SEGMENT, RECENT, OFFSETS
+
+    _log = LANG["fL"] + "." + str(SEGMENT) + ".log"
+    _cols = {"day": [], "kind": "", "id": [], "card": []}
+    _kinds = []
+    with open(_log, "r", encoding="utf-8") as f:
+        for _line in f:
+            if not _line.endswith("\n"):
+                break
+            _event = jloads(_line)
+            _cols["day"].append(_event[0])
+            _kinds.append(_event[1])
+            _cols["id"].append(_event[2])
+            _cols["card"].append(_event[3])
+        f.close()
+    _cols["kind"] = "".join(_kinds)
 
-                with open((LANG["fC"] + ".json"),
-                          "w", encoding="utf-8") as f:
-                    jdump(_new_cards, f)
-                    f.close()
-            if file == "h":
-                _new_help = ""
+    store((LANG["fL"] + "." + str(SEGMENT) + ".json"),
+          lambda f: jdump(_cols, f))
+    for _field in RECENT:
+        for _key, _refs in RECENT[_field].items():
+            ARCHIVE[_field].setdefault(_key, []).extend(_refs)
 
-                with open((LANG["fH"] + ".txt.bak"),
-                          "r", encoding="utf-8") as f:
-                    _new_help = f.read()
-                    f.close()
+    SEGMENT += 1
+    store((LANG["fL"] + ".idx"),
+          lambda f: jdump({"segments": SEGMENT,
+                           "books": ARCHIVE["books"],
+                           "cards": ARCHIVE["cards"]}, f))
+    os.remove(_log)
 
-                with open((LANG["fH"] + ".txt.bak"),
-                          "w", encoding="utf-8") as f:
-                    f.write(HELP)
-                    f.close()
+    RECENT = {"books": {}, "cards": {}}
+    OFFSETS = []
+    _log = LANG["fL"] + "." + str(SEGMENT) + ".log"
+    open(_log, "a", encoding="utf-8").close()
+    STAMPS[_log] = stamp(_log)
 
-                with open((LANG["fH"] + ".txt"),
-                          "w", encoding="utf-8") as f:
-                    f.write(_new_help)
-                    f.close()
 
-            pWin.close()
-        except FileNotFoundError:
-            pWin.close()
-            Popups("e", LANG["err"] + " #U: " + LANG["errU"])
+def recall(field: str, key: str, year: int = None) -> list:
+    """
+    Returns the events of a book or a card, oldest first.
+    < "books" or "cards", Book ID or card, Year or None
+
+    - Reads only the rows the indexes point to, each archive needed is
+      loaded once and the active segment is read at OFFSETS
+    """
+    _events = []
+    _seg = None
+    _cols = {}
+    with open((LANG["fL"] + "." + str(SEGMENT) + ".log"), "rb") as f:
+        for _n, _row in (ARCHIVE[field].get(key, [])
+                         + RECENT[field].get(key, [])):
+            if _n == SEGMENT:
+                f.seek(OFFSETS[_row])
+                _event = jloads(f.readline())
+            else:
+                if _seg != _n:
+                    with open((LANG["fL"] + "." + str(_n) + ".json"), "r",
+                              encoding="utf-8") as a:
+                        _cols = jload(a)
+                        a.close()
+                    _seg = _n
+                _event = [_cols["day"][_row], _cols["kind"][_row],
+                          _cols["id"][_row], _cols["card"][_row]]
+
+            if year is None or date.fromordinal(_event[0]).year == year:
+                _events.append(_event)
+        f.close()
+
+    return _events
 
 
-def expander(abbr: str) -> None:
-    global ROWS
+def migrate() -> None:
+    """
+    Updates books and cards saved by older versions.
+
+    - Strips the padding off book IDs, renaming books and their loans in
+      a single pass
+    - Drops the titles older versions kept in loans and gives them due
+      dates, as [ID, title, date] became [ID, date, due]
+    - Saves both files once and clears the journal and the undo steps,
+      as they still hold the old IDs and loans
+    """
+    _renamed = {}
+    for _row in list(INDEX.values()):
+        if normid(_row[0]) != _row[0]:
+            _new = list(_row)
+            _new[0] = normid(_row[0])
+            reindex(_row, _new)
+            _renamed[_row[0]] = _new[0]
+
+    _old = False
+    for _card in CARDS["LIST"]:
+        for _entry in CARDS[_card]:
+            if len(_entry) == 3 and type(_entry[2]) == str:
+                del _entry[1]
+            if len(_entry) == 2:
+                _row = INDEX.get(_renamed.get(_entry[0], _entry[0]))
+                if _row is None:
+                    _loc = ""
+                else:
+                    _loc = _row[5]
+                _entry.append(date.fromisoformat(_entry[1]).toordinal()
+                              + period(_card, _loc))
+                _old = True
+
+    for _id, _new in _renamed.items():
+        if _id in LOANS:
+            LOANS[_id][1][0] = _new
 
-    for i in range(0, len(ROWS)):
-        _id = ROWS[i][0]
-        if _id[0] == abbr:
-            if len(_id[1:]) != len(str(IDS[abbr])):
-                ROWS[i][0] = abbr + _id[1:].rjust(len(str(IDS[abbr])), "0")
-                if ROWS[i][6] != LANG["fBS"][0]:
-                    card = CARDS[ROWS[i][6][2:]]
-                    for j in range(0, len(card)):
-                        if card[j][0] == _id:
-                            CARDS[ROWS[i][6][2:]][j][0] = ROWS[i][0]
-                    save("c")
+    if _old or _renamed != {}:
+        reloan()
+        save("b")
+        store((LANG["fJ"] + ".log"), lambda f: f.write(""))
+        store((LANG["fU"] + ".log"), lambda f: f.write(""))
 
 
-def add() -> None:
+def keep() -> None:
     """
-    Makes it possible to add new book records.
-    @ LAST_LOC, WINDOW, CHANGED
-    # err, _inISBN, r
+    Saves TOKENS and GRAMS into books.idx.
+    @ KEPT
 
-    - Preloads data from ISBN code and openlibrary.org record.
-    - Lets the user add other data manually.
+    - Stamped with books.csv, so only a matching file gets loaded back
+    - Only written after a rebuild and on exit, folding the journal
+      leaves it stale until then
     """
-    global LAST_LOC, WINDOW, CHANGED, err, _inISBN, r
+    global KEPT
 
-    if CHANGED:
-        err = ""
-        _inISBN = ""
-        r = {
-             "ID": "",
-             "ISBN": "",
-             "Author": "",
-             "Title": "",
-             "Genre": "",
-             "Location": LAST_LOC,
-             "State": LANG["fBS"][0]
-        }
-        CHANGED = False
-
-    aLO = [[sg.P(),
-            sg.B(LANG["m"], k="Main"),
-            sg.B("[" + LANG["a"] + "]"),
-            sg.B(LANG["s"], k="Search"),
-            sg.B(LANG["c"], k="Cards"),
-            sg.B(LANG["h"], k="Help"),
-            sg.B(LANG["u"], k="Undo"),
-            sg.P()],
-           [sg.T(LANG["aQ"])],
-           [sg.T(LANG["fBD"][1] + ":"), sg.I(r["ISBN"], k="inISBN"),
-            sg.B(LANG["aL"], k="Load")],
-           [sg.T(LANG["fBD"][2] + ":"), sg.I(r["Author"], k="author")],
-           [sg.T(LANG["fBD"][3] + ":"), sg.I(r["Title"], k="title"),
-            sg.B(LANG["aF"], k="Find")],
-           [sg.T(LANG["fBD"][4] + ":"), sg.I(r["Genre"], k="genre")],
-           [sg.T(LANG["fBD"][5] + ":"), sg.I(r["Location"], k="location")],
-           [sg.T(LANG["fBD"][6] + ":"), sg.I(LANG["fBS"][0], disabled=True)],
-           [sg.T(err)],
-           [sg.P(), sg.B(LANG["a"], k="Add", bind_return_key=True)]]
-    aWin = sg.Window(LANG["name"], aLO, icon=ICON)
-    aEv, aVal = aWin.read()
+    _idx = {"stamp": list(STAMPS[LANG["fB"] + ".csv"]),
+            "tokens": {},
+            "grams": {}}
+    for i in TOKENS:
+        _idx["tokens"][i] = {}
+        for _tok, _ids in TOKENS[i].items():
+            _idx["tokens"][i][_tok] = list(_ids)
+        _idx["grams"][i] = {}
+        for _gram, _ids in GRAMS[i].items():
+            _idx["grams"][i][_gram] = list(_ids)
 
-    err = ""
+    store((LANG["fB"] + ".idx"), lambda f: jdump(_idx, f))
+    KEPT = True
 
-    aWin.close()
-    if aEv is None:
-        WINDOW = ""
-    else:
-        r["Author"] = aVal["author"].replace(",", ";")
-        r["Title"] = aVal["title"].replace(",", ";")
-        r["Genre"] = aVal["genre"].replace(",", ";")
-        r["Location"] = aVal["location"].replace(",", ";")
-        LAST_LOC = r["Location"]
-
-    if aEv == "Main":
-        WINDOW = "m"
-        CHANGED = True
-    if aEv == "Search":
-        WINDOW = "s"
-        CHANGED = True
-    if aEv == "Cards":
-        WINDOW = "c"
-        CHANGED = True
-    if aEv == "Help":
-        WINDOW = "h"
-    if aEv == "Undo":
-        WINDOW = "u"
-    if aEv == "Load":
-        pWin = Loading()
 
-        _inISBN = aVal["inISBN"]
-        _inISBN = _inISBN.replace("-", "")
-        if isbn.is_isbn10(_inISBN) or isbn.is_isbn13(_inISBN):
-            r["ISBN"] = _inISBN
+def append(file: str, *lines: list) -> None:
+    """
+    Appends JSON lines to a log file and syncs it.
+    < File, Lines
 
-            try:
-                _data = isbn.meta(_inISBN)
-            except isbn.dev._exceptions.ISBNLibURLError:
-                pWin.close()
-                Popups("e", LANG["err"] + " #A1: " + LANG["errA1"])
-                pWin = Loading()
-            finally:
-                try:
-                    r["Title"] = _data["Title"]
-                except KeyError:
-                    pass
+    - All lines are synced at once, so a group of changes costs a single
+      fsync
+    - Lines end with a bare newline on every system, so their lengths in
+      bytes give the offsets of the history
+    """
+    with open(file, "a", encoding="utf-8", newline="") as f:
+        for _line in lines:
+            f.write(jdumps(_line, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+    STAMPS[file] = stamp(file)
 
-                try:
-                    r["Author"] = "; ".join(author
-                                            for author
-                                            in _data["Authors"])
-                except KeyError:
-                    pass
 
-            g = ""
-            if LNG == "cs":
-                try:
-                    db = requests.get(url=("https://www.databazeknih.cz/"
-                                           + "search?q=" + _inISBN
-                                           + "&hledat="),
-                                      allow_redirects=True)
-                except requests.exceptions.ConnectionError:
-                    pWin.close()
-                    Popups("e", LANG["err"] + " #A2: " + LANG["errA2"])
-                    pWin = Loading()
-                else:
-                    if db.status_code == 200:
-                        db = db.text
+def journal(*changes: list) -> None:
+    """
+    Appends changes of books or cards to journal.log, one line each.
+    @ JOURNAL
+    < Ops of the changes
+
+    - Holds all ops of apply() but the key
+    - A loan is one short line, so lending doesn't rewrite cards.json
+    - Folds the journal into its files by WRITER once it reaches
+      JOURNAL_MAX lines
+    """
+    global JOURNAL
 
-                        start = db.find("<h5 itemprop='genre'>") + 21
-                        end = start + db[start:].find("</h5>")
-                        db = db[start:end]
-                        db = db.replace("</a>, ", "\n")
-                        db = db.replace("</a>", "")
-                        db = re.split("<.*'>", db)
+    append((LANG["fJ"] + ".log"), *changes)
 
-                        db.pop(0)
+    JOURNAL += len(changes)
+    if JOURNAL - len(changes) < JOURNAL_MAX <= JOURNAL:
+        WRITER.submit(fold)
 
-                        for i in db:
-                            g += i + "; "
 
-                        g = g[:-2]
-                        g = g.replace("\n", "")
-                        g = g.replace(",", ";")
-                    else:
-                        pWin.close()
-                        Popups("e", LANG["err"] + " #A2: " + LANG["errA2"])
-                        pWin = Loading()
-            elif LNG == "en":
-                try:
-                    db = requests.get(url=("https://openlibrary.org/isbn/"
-                                           + _inISBN),
-                                      allow_redirects=True)
-                except requests.exceptions.ConnectionError:
-                    pWin.close()
-                    Popups("e", LANG["err"] + " #A2: " + LANG["errA2"])
-                    pWin = Loading()
-                else:
-                    if db.status_code == 200:
-                        db = db.text
-
-                        start = db.find("<h6>Subjects</h6>") + 18
-                        end = start + db[start:].find("</span>")
-                        db = db[start:end]
-                        db = db.replace("</a>,", "")
-                        db = db.replace("</a>", "")
-                        db = re.split(' *<.*">', db)
-
-                        db.pop(0)
-
-                        for i in db:
-                            g += i + "; "
-
-                        g = g[:-2]
-                        g = g.replace("&amp;", "&")
-                        g = g.replace("\n", "")
-                        g = g.replace(",", ";")
-                    else:
-                        pWin.close()
-                        Popups("e", LANG["err"] + " #A2: " + LANG["errA2"])
-                        pWin = Loading()
+def fold() -> None:
+    """
+    Folds the journal into books.csv, ids.json and cards.json.
 
-            r["Genre"] = g
-            pWin.close()
-        else:
-            Popups("e", LANG["err"] + " #A3: " + LANG["errA3"])
-            pWin.close()
-    if aEv == "Find":
-        if LNG == "cs":
-            webbrowser.open(url=("https://www.databazeknih.cz/search?q="
-                                 + aVal["title"]
-                                 + "&hledat="))
-        elif LNG == "en":
-            webbrowser.open(url=("https://openlibrary.org/search?q="
-                                 + aVal["title"]
-                                 + "&mode=everything"))
-    if aEv == "Add":
-        if (aVal["author"] != ""
-                and aVal["title"] != ""
-                and aVal["genre"] != ""
-                and aVal["location"] != ""):
-            abbr = r["Location"][0]
+    - Holds DESK, so no change is applied or file reloaded meanwhile
+    - Writes lodged changes first, as the files get them from memory
+      and the journal is emptied after
+    """
+    with DESK:
+        _changes = list(PENDING)
+        PENDING.clear()
+        if _changes != []:
+            write(_changes)
+        save("b")
 
-            try:
-                int(abbr)
-            except ValueError:
-                pWin = Loading()
-                if abbr not in IDS:
-                    IDS[abbr] = 0
 
-                IDS[abbr] += 1
+def commit(ops: list, step: str = "p") -> None:
+    """
+    Applies, saves and records a change.
+    @ REDO
+    < Ops, Step
+
+    - Available steps:
+      - p - a new change, clears the steps to redo
+      - u - an undone change
+      - r - a redone change
+    - Waits for DESK, while WRITER folds the journal
+    """
+    global REDO
 
-                if len(str(IDS[abbr] - 1)) != len(str(IDS[abbr])):
-                    expander(abbr)
+    with DESK:
+        apply(ops)
+        if step == "p":
+            UNDO.append(ops)
+            REDO = []
+        write([ops], step)
 
-                r["ID"] = abbr + str(IDS[abbr])
 
-                ROWS.append([r["ID"],
-                             r["ISBN"],
-                             r["Author"],
-                             r["Title"],
-                             r["Genre"],
-                             r["Location"],
-                             r["State"]])
-                save("b")
-                pWin.close()
-                err = LANG["aS"] + r["ID"]
-                _inISBN = ""
-                r = {
-                    "ID": "",
-                    "ISBN": "",
-                    "Author": "",
-                    "Title": "",
-                    "Genre": "",
-                    "Location": LAST_LOC,
-                    "State": LANG["fBS"][0]
-                }
-            else:
-                err = LANG["err"] + " #A4: " + LANG["errA4"]
-        else:
-            err = LANG["err"] + " #A5: " + LANG["errA5"]
+def lodge(ops: list) -> None:
+    """
+    Applies a new change at once and leaves saving it to WRITER.
+    @ REDO
+    < Ops
 
+    - Changes lodged within GROUP seconds are written together by flush()
+    """
+    global REDO
+
+    with DESK:
+        apply(ops)
+        UNDO.append(ops)
+        REDO = []
+        PENDING.append(ops)
+        if len(PENDING) == 1:
+            FLUSHES.append(WRITER.submit(flush))
 
-def search() -> None:
+
+def flush() -> None:
     """
-    Allows the search of book records.
-    @ WINDOW, CHANGED
-    # par, res, num
+    Writes the lodged changes as one group.
 
-    - Possible filters:
-      - Genre
-      - Author
-      - Title
+    - Waits GROUP seconds first, so changes made in the meantime join
+    - DESK is held only while taking the group, so lodge() never waits
+      for the disk
+    - Takes the undo and redo steps along with the group, as changes
+      lodged later aren't written yet
     """
-    global WINDOW, CHANGED, par, res, num
-    if CHANGED:
-        par = ["", "", ""]
-        res = []
-        num = 0
-        CHANGED = False
-
-    sLO = [[sg.P(),
-            sg.B(LANG["m"], k="Main"),
-            sg.B(LANG["a"], k="Add"),
-            sg.B("[" + LANG["s"] + "]"),
-            sg.B(LANG["c"], k="Cards"),
-            sg.B(LANG["h"], k="Help"),
-            sg.B(LANG["u"], k="Undo"),
-            sg.P()],
-           [sg.T(LANG["sP"])],
-           [sg.T("1. " + LANG["fBD"][4] + ":"), sg.I(par[0], k="zero")],
-           [sg.T("2. " + LANG["fBD"][2] + ":"), sg.I(par[1], k="one")],
-           [sg.T("3. " + LANG["fBD"][3] + ":"), sg.I(par[2], k="two")],
-           [sg.T(LANG["sT"] + str(num)),
-            sg.P(),
-            sg.B(LANG["s"], k="Search", bind_return_key=True)],
-           [sg.Table(values=res,
-                     headings=FIELDS,
-                     auto_size_columns=True,
-                     max_col_width=30,
-                     justification="center",
-                     num_rows=30,
-                     enable_click_events=True,
-                     alternating_row_color="#a0ca6d",
-                     k="Table")]]
-    sWin = sg.Window(LANG["name"], sLO, icon=ICON)
-    sEv, sVal = sWin.read()
+    sleep(GROUP)
+    with DESK:
+        _changes = list(PENDING)
+        PENDING.clear()
+        _steps = (list(UNDO), list(REDO))
+    if _changes != []:
+        write(_changes, "p", _steps)
 
-    sWin.close()
-    if sEv is None:
-        WINDOW = ""
+
+def write(changes: list, step: str = "p", steps: tuple = None) -> None:
+    """
+    Saves and records applied changes.
+    @ STEPS
+    < Changes, Step, Undo and redo steps of the changes
+
+    - Changes of books and cards go to the journal, the key saves its
+      file
+    - Borrows and returns are added to the history
+    - Steps are logged into changes.log, which is rewritten from the
+      given steps, or UNDO and REDO, once it grows past twice UNDO_MAX
+      lines
+    - Every file is synced once for all the changes
+    """
+    global STEPS
+
+    _journal = []
+    for ops in changes:
+        _ops = [op for op in ops if op[0] != "h"]
+        if _ops != []:
+            _journal.append(_ops)
+        if len(_ops) != len(ops):
+            save("h")
+    if _journal != []:
+        journal(*_journal)
+        record([op for _ops in _journal for op in _ops])
+
+    if step == "p":
+        append((LANG["fU"] + ".log"), *[["p", ops] for ops in changes])
     else:
-        par = [sVal["zero"].lower(),
-               sVal["one"].lower(),
-               sVal["two"].lower()]
-
-    if sEv == "Main":
-        WINDOW = "m"
-        CHANGED = True
-    if sEv == "Add":
-        WINDOW = "a"
-        CHANGED = True
-    if sEv == "Cards":
-        WINDOW = "c"
-        CHANGED = True
-    if sEv == "Help":
-        WINDOW = "h"
-    if sEv == "Undo":
-        WINDOW = "u"
-    if type(sEv) == tuple:
-        if (sEv[2][0] != -1
-                and sEv[2][1] != -1
-                and sEv[2][0] is not None):
-            pWin = Loading()
-            id = res[sEv[2][0]][0]
+        append((LANG["fU"] + ".log"), *[[step] for ops in changes])
 
-            for i in range(0, len(ROWS)):
-                if ROWS[i][0] == id:
-                    pWin.close()
-                    edit(i)
-    if sEv == "Search":
-        pWin = Loading()
-        res = []
+    STEPS += len(changes)
+    if STEPS > 2 * UNDO_MAX:
+        if steps is None:
+            steps = (UNDO, REDO)
+        rewind(*steps)
 
-        if par[0] != "":
-            for i in ROWS:
-                if par[0] in i[4].lower():
-                    res.append(i)
-        if par[1] != "":
-            if res != []:
-                for i in res:
-                    if par[1] not in i[2].lower():
-                        res.pop(i)
-            else:
-                for i in ROWS:
-                    if par[1] in i[2].lower():
-                        res.append(i)
-        if par[2] != "":
-            if res != []:
-                for i in res:
-                    if par[2] not in i[3].lower():
-                        res.pop(i)
-            else:
-                for i in ROWS:
-                    if par[2] in i[3].lower():
-                        res.append(i)
 
-        pWin.close()
-        num = len(res)
+def rewind(undo: list, redo: list) -> None:
+    """
+    Rewrites changes.log from undo and redo steps.
+    @ STEPS
+    < Undo steps, Redo steps
+    """
+    global STEPS
+
+    def _steps(f):
+        for _ops in list(undo) + list(reversed(redo)):
+            f.write(jdumps(["p", _ops], ensure_ascii=False) + "\n")
+        for _ops in redo:
+            f.write(jdumps(["u"]) + "\n")
+
+    store((LANG["fU"] + ".log"), _steps)
+    STEPS = len(undo) + 2 * len(redo)
 
 
-def cards() -> None:
+def layout() -> list:
     """
-    The library card interface.
-    @ WINDOW, CHANGED
-    # vw, card, err
+    Lays out the one window of the app.
+    @ FIELDS
 
-    - Add and remove borrowed books from selected card.
-    - See when selected card borrowed which book.
-    - Create and/or delete library cards.
+    - Every screen is a tab of it, so switching screens builds nothing
+    - Elements are keyed uniquely across tabs, so refresh() and the tab
+      handlers can update them in place
     """
-    global WINDOW, CHANGED, vw, card, err
-    if CHANGED:
-        vw = [[]]
-        card = ""
-        err = ""
-        CHANGED = False
-
-    if card != "" and card in CARDS["LIST"]:
-        vw = CARDS[card]
-
-    cLO = [[sg.P(),
-            sg.B(LANG["m"], k="Main"),
-            sg.B(LANG["a"], k="Add"),
-            sg.B(LANG["s"], k="Search"),
-            sg.B("[" + LANG["c"] + "]"),
-            sg.B(LANG["h"], k="Help"),
-            sg.B(LANG["u"], k="Undo"),
-            sg.P()],
-           [sg.T("ID"),
+    mLO = [[sg.B(LANG["mU"], k="Upgrade", visible=False),
+            sg.P(),
+            sg.T(LANG["mV"]),
+            sg.DD([30, 60, 90, 120, LANG["mA"]],
+                  30,
+                  k="Num",
+                  enable_events=True)],
+           [sg.Table(values=[],
+                     headings=FIELDS,
+                     auto_size_columns=True,
+                     max_col_width=30,
+                     justification="center",
+                     num_rows=30,
+                     enable_click_events=True,
+                     alternating_row_color="#a0ca6d",
+                     k="Table")],
+           [sg.B("<<", k="Start"),
+            sg.B("<", k="Prev"),
+            sg.P(),
+            sg.B("[1/1]", k="Page"),
+            sg.P(),
+            sg.B(">", k="Next"),
+            sg.B(">>", k="End")]]
+    aLO = [[sg.T(LANG["aQ"])],
+           [sg.T(LANG["fBD"][1] + ":"), sg.I(k="inISBN", enable_events=True),
+            sg.B(LANG["aL"], k="Load")],
+           [sg.T(LANG["fBD"][2] + ":"), sg.I(k="author")],
+           [sg.T(LANG["fBD"][3] + ":"), sg.I(k="title"),
+            sg.B(LANG["aF"], k="Find")],
+           [sg.T(LANG["fBD"][4] + ":"), sg.I(k="genre")],
+           [sg.T(LANG["fBD"][5] + ":"), sg.I(LAST_LOC, k="location")],
+           [sg.T(LANG["fBD"][6] + ":"), sg.I(LANG["fBS"][0], disabled=True)],
+           [sg.T("", size=(60, 1), k="aErr")],
+           [sg.B(LANG["aI"], k="Import"), sg.P(), sg.B(LANG["a"], k="Add")]]
+    sLO = [[sg.T(LANG["sP"])],
+           [sg.T("1. " + LANG["fBD"][4] + ":"), sg.I(k="zero")],
+           [sg.T("2. " + LANG["fBD"][2] + ":"), sg.I(k="one")],
+           [sg.T("3. " + LANG["fBD"][3] + ":"), sg.I(k="two")],
+           [sg.T(LANG["sT"] + "0", size=(30, 1), k="sTotal"),
+            sg.P(),
+            sg.B(LANG["s"], k="Search")],
+           [sg.Table(values=[],
+                     headings=FIELDS,
+                     auto_size_columns=True,
+                     max_col_width=30,
+                     justification="center",
+                     num_rows=30,
+                     enable_click_events=True,
+                     alternating_row_color="#a0ca6d",
+                     k="sTable")]]
+    cLO = [[sg.T("ID"),
             sg.I(k="id"),
             sg.P(),
-            sg.DD(CARDS["LIST"], card, k="Card"),
+            sg.DD(CARDS["LIST"], "", k="Card"),
             sg.B(LANG["cV"], k="View")],
            [sg.B(LANG["cB"], k="Borrow"),
             sg.B(LANG["cR"], k="Return"),
             sg.P(),
+            sg.B(LANG["cD"], k="Desk"),
+            sg.B(LANG["cY"], k="History"),
+            sg.B(LANG["cO"], k="Overdue"),
             sg.B(LANG["cM"], k="Manage")],
-           [sg.T(LANG["cC"] + card), sg.P(), sg.T(err), sg.P(), sg.P()],
-           [sg.Table(values=vw,
+           [sg.T(LANG["cC"], size=(30, 1), k="cCard"),
+            sg.P(),
+            sg.T("", size=(40, 1), k="cErr"),
+            sg.P(),
+            sg.P()],
+           [sg.Table(values=[],
                      headings=LANG["cH"],
                      auto_size_columns=True,
                      max_col_width=30,
                      justification="center",
                      num_rows=30,
                      alternating_row_color="#a0ca6d",
-                     k="Table")]]
-    cWin = sg.Window(LANG["name"], cLO, icon=ICON)
-    cEv, cVal = cWin.read()
+                     k="cTable")]]
+    hLO = [[sg.T(LANG["h"] + ":")],
+           [sg.Multiline(HELP, k="help", size=(60, 20))],
+           [sg.CB(LANG["hF"], CONFIG["fast"], k="Fast", enable_events=True),
+            sg.P(),
+            sg.B(LANG["hS"], k="Save")]]
+    uLO = [[sg.T(LANG["uS"] + "0 / 0", size=(40, 1), k="uSteps"),
+            sg.P(),
+            sg.B(LANG["u"], k="u"),
+            sg.B(LANG["r"], k="r")]]
 
-    err = ""
+    return [[sg.TabGroup([[sg.Tab(LANG["m"], mLO, k="TabM"),
+                           sg.Tab(LANG["a"], aLO, k="TabA"),
+                           sg.Tab(LANG["s"], sLO, k="TabS"),
+                           sg.Tab(LANG["c"], cLO, k="TabC"),
+                           sg.Tab(LANG["h"], hLO, k="TabH"),
+                           sg.Tab(LANG["u"], uLO, k="TabU")]],
+                         k="Tabs",
+                         enable_events=True)]]
+
+
+def refresh(tab: str) -> None:
+    """
+    Updates the elements of a tab in place.
+    # page, final, view, card, shown
+    < Tab key
+
+    - Only the shown tab is filled, the others are filled once selected
+    - The key is only replaced after HELP has changed, so unsaved edits
+      survive switching tabs
+    """
+    global page, final, view, shown
+
+    if tab == "TabM":
+        if num == -1:
+            start = 0
+            end = len(INDEX)
+            final = 0
+        else:
+            final = max(0, ceil(len(INDEX)/num)-1)
+            page = min(page, final)
+            start = 0 + (num * page)
+            end = num + (num * page)
+
+        _perm = order(SORT)
+        if REVERSE:
+            _page = _perm[max(0, len(_perm) - end):len(_perm) - start][::-1]
+        else:
+            _page = _perm[start:end]
+
+        view = [_key[-1] for _key in _page]
+        WIN["Table"].update(values=[INDEX[_id] for _id in view])
+        WIN["Page"].update("[" + str(page+1) + "/" + str(final+1) + "]")
+    if tab == "TabC":
+        WIN["Card"].update(value=card, values=CARDS["LIST"])
+        WIN["cCard"].update(LANG["cC"] + card)
+        if card in CARDS["LIST"]:
+            _loans = []
+            for _id, _day, _due in CARDS[card]:
+                _due = date.fromordinal(_due).isoformat()
+                if _id in INDEX:
+                    _loans.append([_id, INDEX[_id][3], _day, _due])
+                else:
+                    _loans.append([_id, "", _day, _due])
+            WIN["cTable"].update(values=_loans)
+        else:
+            WIN["cTable"].update(values=[])
+    if tab == "TabU":
+        WIN["uSteps"].update(LANG["uS"] + str(len(UNDO))
+                             + " / " + str(len(REDO)))
+    if HELP != shown:
+        WIN["help"].update(HELP)
+        shown = HELP
+
+
+def main(ev, val: dict) -> None:
+    """
+    The Main tab.
+    @ SORT, REVERSE
+    # page, num
+    < Event, Values
+
+    - Pages through the books, sorted by a clicked column heading
+    - Pages are sliced from the cached permutation of the sort column
+    - Offers the developer's website once a newer release was found
+    """
+    global SORT, REVERSE, page, num
+
+    if ev == "Upgrade":
+        if Popups("yn", LANG["up"]) == "Yes":
+            browse("https://github.com/FTEdianiaK/"
+                   + "library-parrotex/releases/latest")
+
+    if ev == "Num":
+        page = 0
+
+        if val["Num"] == LANG["mA"]:
+            num = -1
+        else:
+            try:
+                num = int(val["Num"])
+            except TypeError:
+                pass
+            except ValueError:
+                pass
+    if ev == "Start":
+        page = 0
+    if ev == "Prev" and page != 0:
+        page -= 1
+    if ev == "Next" and page != final:
+        page += 1
+    if ev == "End":
+        page = final
+    if type(ev) == tuple and ev[0] == "Table":
+        if ev[2][0] == -1 and ev[2][1] != -1:
+            if SORT == ev[2][1]:
+                REVERSE = not REVERSE
+            else:
+                SORT = ev[2][1]
+                REVERSE = False
+        elif ev[2][0] is not None and ev[2][0] < len(view):
+            if view[ev[2][0]] in INDEX:
+                edit(view[ev[2][0]])
+
+
+def store(file: str, write) -> None:
+    """
+    Atomically replaces a file, demoting the old one to a backup.
+    @ STAMPS
+    < File, Function writing the new content into an open file
+
+    - Writes file.tmp, renames file to file.bak and file.tmp to file
+    - A crash never leaves a half-written file behind
+    """
+    with open((file + ".tmp"), "w", encoding="utf-8") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+
+    if os.path.exists(file):
+        os.replace(file, (file + ".bak"))
+    os.replace((file + ".tmp"), file)
+    STAMPS[file] = stamp(file)
+
+
+def save(files: str) -> None:
+    """
+    Saves and Backups selected files.
+    @ JOURNAL, KEPT
+    < Files
+
+    - Available files:
+      - b - LANG["fB"].csv + LANG["fI"].json + LANG["fC"].json
+      - h - LANG["fH"].txt
+    - Keeps stamps of the saved files, so load() doesn't reread them
+    - Saving b folds LANG["fJ"].log into the files, search indexes are
+      saved by keep()
+    """
+    global JOURNAL, KEPT
+
+    if "b" in files:
+        def _books(f):
+            _wrt = cwrite(f)
+            _wrt.writerow(FIELDS)
+            for _key in order(0):
+                _wrt.writerow(INDEX[_key[-1]])
+
+        store((LANG["fB"] + ".csv"), _books)
+        store((LANG["fI"] + ".json"), lambda f: jdump(IDS, f))
+        store((LANG["fC"] + ".json"), lambda f: jdump(CARDS, f))
+        store((LANG["fJ"] + ".log"), lambda f: f.write(""))
+        JOURNAL = 0
+        KEPT = False
+    if "h" in files:
+        store((LANG["fH"] + ".txt"), lambda f: f.write(HELP))
+
+
+def undo(ev, val: dict) -> None:
+    """
+    Undoes and redoes changes, one at a time.
+    < Event, Values
+
+    - Steps are taken from UNDO and REDO, holding up to UNDO_MAX changes
+    - Only the changed rows, counters, card entries or key are applied
+    """
+    if ev == "u":
+        if len(UNDO) == 0:
+            Popups("e", LANG["err"] + " #U: " + LANG["errU"])
+        else:
+            _ops = UNDO.pop()
+            REDO.append(_ops)
+            commit(inverse(_ops), "u")
+    if ev == "r":
+        if REDO == []:
+            Popups("e", LANG["err"] + " #R: " + LANG["errR"])
+        else:
+            _ops = REDO.pop()
+            UNDO.append(_ops)
+            commit(_ops, "r")
+
+
+def release() -> str:
+    """
+    Returns the name of the latest release, or "" when it's unknown.
+    < None
+
+    - Asks GitHub once a day at most, the answer is kept in version.json
+    - The request is conditional on the kept ETag, so an unchanged list
+      of releases comes back empty as 304
+    - Runs in the background with a short timeout, a failed check only
+      waits for the next day
+    """
+    try:
+        with open((LANG["fV"] + ".json"), "r", encoding="utf-8") as f:
+            _kept = jload(f)
+            f.close()
+    except (OSError, ValueError):
+        _kept = {}
+
+    if time() - _kept.get("time", 0) < RELEASES_TTL:
+        return _kept.get("name", "")
+
+    online()
+    _kept["time"] = time()
+    _head = {"Accept": "application/vnd.github+json"}
+    if "etag" in _kept:
+        _head["If-None-Match"] = _kept["etag"]
+
+    try:
+        _resp = SESSION.get(RELEASES, headers=_head,
+                            timeout=RELEASES_TIMEOUT)
+        if _resp.status_code == 200:
+            _kept["name"] = _resp.json()[0]["name"]
+            _kept["etag"] = _resp.headers.get("ETag", "")
+    except (requests.exceptions.RequestException, ValueError,
+            KeyError, IndexError):
+        pass
+
+    store((LANG["fV"] + ".json"), lambda f: jdump(_kept, f))
+    return _kept.get("name", "")
+
+
+def throttle(host: str) -> None:
+    """
+    Waits for the next free slot of a site.
+    @ NEXT
+    < Host
+
+    - Requests to one host are spaced by RATES seconds, even when they
+      come from several threads at once
+    """
+    with LOCK:
+        _at = max(time(), NEXT.get(host, 0))
+        NEXT[host] = _at + RATES.get(host, 0)
+
+    sleep(max(0, _at - time()))
+
+
+def fetchmeta(code: str, service: str) -> dict:
+    """
+    Asks an isbnlib service for title and authors of a book.
+    < ISBN, Service
+
+    - Returns None when the service couldn't be reached
+    - A book the service doesn't know gives an empty answer
+    """
+    try:
+        _data = isbn.meta(code, service=service)
+    except (isbn.dev.ISBNLibURLError,
+            isbn.dev.ISBNLibHTTPError,
+            isbn.dev.ServiceIsDownError):
+        return None
+    except isbn.ISBNLibException:
+        return {}
+
+    return {"title": _data.get("Title", ""),
+            "authors": _data.get("Authors", [])}
+
+
+def fetchol(code: str) -> dict:
+    """
+    Asks the openlibrary.org JSON API for a book.
+    < ISBN
+
+    - Returns None when the site couldn't be loaded
+    - Answers title, authors and subjects with one request
+    """
+    try:
+        db = SESSION.get(url=("https://openlibrary.org/api/books"
+                              + "?bibkeys=ISBN:" + code
+                              + "&jscmd=data&format=json"),
+                         timeout=TIMEOUT)
+    except requests.exceptions.RequestException:
+        return None
+
+    if db.status_code != 200:
+        return None
+
+    try:
+        _data = db.json().get("ISBN:" + code, {})
+    except ValueError:
+        return None
+
+    _res = {"title": _data.get("title", ""), "authors": [], "subjects": []}
+    for i in _data.get("authors", []):
+        if i.get("name", "") != "":
+            _res["authors"].append(i["name"])
+    for i in _data.get("subjects", []):
+        if type(i) == dict:
+            i = i.get("name", "")
+        if i != "":
+            _res["subjects"].append(i.replace(",", ";"))
+
+    return _res
+
+
+class Genres(HTMLParser):
+    """
+    Picks genres out of a databazeknih.cz page as it streams in.
+
+    - Collects links inside <h5 itemprop='genre'>, done once it closes
+    """
+    def __init__(self):
+        super().__init__()
+        self.inside = False
+        self.link = None
+        self.done = False
+        self.genres = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "h5" and ("itemprop", "genre") in attrs:
+            self.inside = True
+        elif tag == "a" and self.inside:
+            self.link = ""
+
+    def handle_data(self, data):
+        if self.link is not None:
+            self.link += data
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self.link is not None:
+            if self.link.strip() != "":
+                self.genres.append(self.link.strip())
+            self.link = None
+        elif tag == "h5" and self.inside:
+            self.inside = False
+            self.done = True
+
+
+def fetchgenre(code: str, stop: Event) -> dict:
+    """
+    Gets genres of a book from databazeknih.cz.
+    < ISBN, Event telling it to give up
+
+    - Returns None when the site couldn't be loaded
+    - The page is streamed through Genres in chunks of CHUNK bytes and
+      the rest of it is never downloaded
+    """
+    try:
+        db = SESSION.get(url=("https://www.databazeknih.cz/"
+                              + "search?q=" + code
+                              + "&hledat="),
+                         allow_redirects=True,
+                         timeout=TIMEOUT,
+                         stream=True)
+    except requests.exceptions.RequestException:
+        return None
+
+    with db:
+        if db.status_code != 200:
+            return None
+
+        if db.encoding is None:
+            db.encoding = "utf-8"
+        _parser = Genres()
+        try:
+            for _chunk in db.iter_content(chunk_size=CHUNK,
+                                          decode_unicode=True):
+                if stop.is_set():
+                    return None
+                _parser.feed(_chunk)
+                if _parser.done:
+                    break
+        except requests.exceptions.RequestException:
+            return None
+
+    return {"subjects": [i.replace(",", ";") for i in _parser.genres]}
+
+
+def provide(name: str, code: str, stop: Event) -> dict:
+    """
+    Asks one provider of PROVIDERS about a book.
+    < Provider, ISBN, Event telling it to give up
+
+    - Waits for its site in throttle() and gives up if the lookup has
+      been answered meanwhile
+    - Returns the fields it knows, or None when it failed
+    """
+    throttle(PROVIDERS[name][0])
+    if stop.is_set():
+        return None
+
+    if name == "ol":
+        return fetchol(code)
+    if name == "dbk":
+        return fetchgenre(code, stop)
+    return fetchmeta(code, name)
+
+
+def offline(code: str) -> dict:
+    """
+    Looks a book up in openlibrary.db made by --ingest.
+    @ OFFLINE
+    < ISBN
+
+    - Returns None when the book or the file isn't there
+    - Resolves author keys through the authors table, if it was ingested
+    """
+    global OFFLINE
+
+    if not os.path.exists(LANG["fO"] + ".db"):
+        return None
+
+    with LOCK:
+        try:
+            if OFFLINE is None:
+                OFFLINE = sqlite3.connect((LANG["fO"] + ".db"),
+                                          check_same_thread=False)
+
+            _row = OFFLINE.execute("SELECT title, authors, subjects "
+                                   + "FROM books WHERE isbn = ?",
+                                   (isbn.to_isbn13(code),)).fetchone()
+            if _row is None:
+                return None
+
+            _names = []
+            for _name in jloads(_row[1]):
+                if _name.startswith("/authors/"):
+                    _hit = OFFLINE.execute("SELECT name FROM authors "
+                                           + "WHERE key = ?",
+                                           (_name,)).fetchone()
+                    if _hit is not None:
+                        _names.append(_hit[0])
+                else:
+                    _names.append(_name)
+        except sqlite3.Error:
+            return None
+
+    return {"title": _row[0], "authors": _names, "subjects": jloads(_row[2])}
+
+
+def ingest(files: list) -> None:
+    """
+    Builds openlibrary.db from OpenLibrary dumps or JSON lines of editions.
+    < Files
 
-    cWin.close()
-    if cEv is None:
-        WINDOW = ""
+    - Goes line by line and writes in batches of INGEST_BATCH rows, so
+      memory stays bounded however big the dump is
+    - Reads .gz files as they are
+    - Takes the tab separated lines of OpenLibrary dumps as well as plain
+      JSON lines, editions are kept by ISBN-13 and authors by their key
+    """
+    online()
+    _db = sqlite3.connect(LANG["fO"] + ".db")
+    _db.execute("PRAGMA journal_mode=WAL")
+    _db.execute("PRAGMA synchronous=OFF")
+    _db.execute("CREATE TABLE IF NOT EXISTS books (isbn TEXT PRIMARY KEY, "
+                + "title TEXT, authors TEXT, subjects TEXT) WITHOUT ROWID")
+    _db.execute("CREATE TABLE IF NOT EXISTS authors (key TEXT PRIMARY KEY, "
+                + "name TEXT) WITHOUT ROWID")
+
+    def _flush(books, authors):
+        _db.executemany("INSERT OR REPLACE INTO books VALUES (?, ?, ?, ?)",
+                        books)
+        _db.executemany("INSERT OR REPLACE INTO authors VALUES (?, ?)",
+                        authors)
+        _db.commit()
+        books.clear()
+        authors.clear()
+
+    for file in files:
+        if file.endswith(".gz"):
+            f = gzip.open(file, "rt", encoding="utf-8")
+        else:
+            f = open(file, "r", encoding="utf-8")
+
+        _books = []
+        _authors = []
+        _count = 0
+        with f:
+            for _line in f:
+                _count += 1
+                if _count % 100000 == 0:
+                    print(file + ": " + str(_count))
+
+                if not _line.startswith("{"):
+                    # type, key, revision, last_modified, JSON
+                    _line = _line.rsplit("\t", 1)[-1]
+                try:
+                    _rec = jloads(_line)
+                except ValueError:
+                    continue
+                if type(_rec) != dict:
+                    continue
+
+                _type = _rec.get("type", "/type/edition")
+                if type(_type) == dict:
+                    _type = _type.get("key", "")
+
+                if _type == "/type/author":
+                    if "key" in _rec and "name" in _rec:
+                        _authors.append((_rec["key"], _rec["name"]))
+                elif _type == "/type/edition":
+                    _title = _rec.get("title", "")
+                    if _rec.get("subtitle", "") != "":
+                        _title += ": " + _rec["subtitle"]
+
+                    _names = []
+                    for _author in _rec.get("authors", []):
+                        if type(_author) == dict:
+                            _author = _author.get("author", _author)
+                            _author = _author.get("name",
+                                                  _author.get("key", ""))
+                        if _author != "":
+                            _names.append(str(_author))
+                    if _names == [] and _rec.get("by_statement", "") != "":
+                        _names.append(_rec["by_statement"])
+
+                    _subjects = []
+                    for _subject in _rec.get("subjects", []):
+                        if type(_subject) == dict:
+                            _subject = _subject.get("name", "")
+                        if _subject != "":
+                            _subjects.append(str(_subject).replace(",", ";"))
+
+                    for _code in (_rec.get("isbn_13", [])
+                                  + _rec.get("isbn_10", [])):
+                        _code = str(_code).replace("-", "").replace(" ", "")
+                        if isbn.is_isbn10(_code) or isbn.is_isbn13(_code):
+                            _books.append((isbn.to_isbn13(_code),
+                                           _title,
+                                           jdumps(_names, ensure_ascii=False),
+                                           jdumps(_subjects,
+                                                  ensure_ascii=False)))
+
+                if len(_books) + len(_authors) >= INGEST_BATCH:
+                    _flush(_books, _authors)
+
+        _flush(_books, _authors)
+        print(file + ": " + str(_count))
+
+    _db.close()
+
+
+def lookup(code: str, persist: bool = True, stop: Event = None) -> tuple:
+    """
+    Looks up title, authors and subjects of a book by its ISBN.
+    @ META
+    < ISBN, Whether to save metadata.json right away, Event cancelling it
+
+    - Returns the entry and the codes of the lookups which failed
+    - Asks metadata.json first, keyed by ISBN-13
+      - Entries expire after META_TTL, unknown books after META_MISS
+      - Holds at most META_MAX entries, dropping the least recently used
+    - Then asks openlibrary.db, if it has been built by --ingest
+    - Then races PROVIDERS, fastest first by their LATENCY
+      - Every missing field is asked from one provider, another one is
+        started once it takes twice as long as usual
+      - The first answer of each field wins, the rest are cancelled
+      - Waits for DEADLINE seconds at most, a field nobody could answer
+        is left empty and reported
+      - Setting stop ends it within WAKE seconds
+    - Only complete answers are kept, failed lookups are asked again
+    """
+    online()
+    _key = isbn.to_isbn13(code)
+    _hit = False
+    with LOCK:
+        _entry = META.pop(_key, None)
+        if _entry is not None:
+            if "title" in _entry:
+                _ttl = META_TTL
+            else:
+                _ttl = META_MISS
+
+            if time() - _entry["time"] < _ttl:
+                META[_key] = _entry
+                _hit = True
+
+    if _hit:
+        return ({"title": _entry.get("title", ""),
+                 "authors": _entry.get("authors", []),
+                 "subjects": _entry.get("subjects", [])}, [])
+
+    _entry = offline(code)
+    if _entry is not None:
+        return (_entry, [])
+
+    _entry = {"title": "", "authors": [], "subjects": []}
+    _missing = set(_entry)
+    _answered = set()
+    if stop is None:
+        _stop = Event()
     else:
-        card = cVal["Card"]
-
-    if cEv == "Main":
-        WINDOW = "m"
-        CHANGED = True
-    if cEv == "Add":
-        WINDOW = "a"
-        CHANGED = True
-    if cEv == "Search":
-        WINDOW = "s"
-        CHANGED = True
-    if cEv == "Help":
-        WINDOW = "h"
-    if cEv == "Undo":
-        WINDOW = "u"
-    if cEv == "View":
-        if cVal["Card"] not in CARDS["LIST"]:
-            card = ""
+        _stop = stop
+    _queue = sorted((name for name in PROVIDERS if LNG in PROVIDERS[name][2]),
+                    key=lambda name: LATENCY.get(name, HEDGE))
+    _jobs = {}
+    _end = time() + DEADLINE
+
+    def _hedge(name):
+        return max(HEDGE, 2 * LATENCY.get(name, HEDGE))
+
+    def _track(name, took):
+        LATENCY[name] = (ALPHA * took
+                         + (1 - ALPHA) * LATENCY.get(name, took))
+
+    while _missing != set():
+        _now = time()
+        if _now >= _end or _stop.is_set():
+            break
+
+        # Fields somebody still answers in time
+        _covered = set()
+        for _job, (name, _at) in _jobs.items():
+            if _now - _at < _hedge(name):
+                _covered |= set(PROVIDERS[name][1])
+
+        for name in list(_queue):
+            if (_missing - _covered) & set(PROVIDERS[name][1]):
+                _queue.remove(name)
+                _jobs[POOL.submit(provide, name, code, _stop)] = (name, _now)
+                _covered |= set(PROVIDERS[name][1])
+
+        # Nobody left who could answer the rest
+        _able = set()
+        for name in _queue + [name for name, _at in _jobs.values()]:
+            _able |= set(PROVIDERS[name][1])
+        if _missing & _able == set():
+            break
+
+        # Next hedge still to come, passed ones were dealt with above
+        _wake = _end
+        if _queue != []:
+            for name, _at in _jobs.values():
+                if _at + _hedge(name) > _now:
+                    _wake = min(_wake, _at + _hedge(name))
+
+        _done, _late = wait(_jobs,
+                            timeout=min(WAKE, max(0, _wake - time())),
+                            return_when=FIRST_COMPLETED)
+        for _job in _done:
+            name, _at = _jobs.pop(_job)
+            _res = _job.result()
+            if _res is None:
+                _track(name, DEADLINE)
+                continue
+
+            _track(name, time() - _at)
+            for _field in PROVIDERS[name][1]:
+                _answered.add(_field)
+                if _field in _missing and _res.get(_field):
+                    _entry[_field] = _res[_field]
+                    _missing.discard(_field)
+
+    # A cut off job took at least that long, but it may not look faster
+    _stop.set()
+    for _job, (name, _at) in _jobs.items():
+        _job.cancel()
+        _track(name, max(time() - _at, LATENCY.get(name, 0)))
+
+    _errs = []
+    if {"title", "authors"} & _missing - _answered:
+        _errs.append("A1")
+    if "subjects" in _missing - _answered:
+        _errs.append("A2")
+
+    if _errs == []:
+        with LOCK:
+            if _entry == {"title": "", "authors": [], "subjects": []}:
+                META[_key] = {"time": time()}
+            else:
+                META[_key] = dict(_entry, time=time())
+
+            while len(META) > META_MAX:
+                META.pop(next(iter(META)))
+
+            if persist:
+                store((LANG["fM"] + ".json"),
+                      lambda f: jdump(META, f, ensure_ascii=False))
+
+    return (_entry, _errs)
+
+
+def add(ev, val: dict) -> None:
+    """
+    Makes it possible to add new book records.
+    @ LAST_LOC
+    # _inISBN, ahead
+    < Event, Values
+
+    - Preloads data from ISBN code and openlibrary.org record.
+      - Starts looking up a valid ISBN as soon as it's typed or scanned,
+        so Load mostly finds it done
+      - A lookup ahead is cancelled once the ISBN changes
+      - Typing an ISBN-13 passes for an ISBN-10 at times, so one
+        starting with 978 or 979 waits for all 13 digits
+    - Lets the user add other data manually.
+    """
+    global LAST_LOC, _inISBN, ahead
+
+    WIN["aErr"].update("")
+    LAST_LOC = val["location"].replace(",", ";")
+
+    _code = val["inISBN"].replace("-", "")
+    if ahead is not None and ahead[0] != _code:
+        ahead[2].set()
+        ahead[1].cancel()
+        ahead = None
+
+    if ev in ("inISBN", "Load"):
+        online()
+    if ev == "inISBN" and ahead is None:
+        if _code[0:3] in ("978", "979") and len(_code) < 13:
+            pass
+        elif isbn.is_isbn10(_code) or isbn.is_isbn13(_code):
+            _stop = Event()
+            ahead = (_code, BULK.submit(lookup, _code, True, _stop), _stop)
+    if ev == "Load":
+        pWin = Loading()
+
+        if isbn.is_isbn10(_code) or isbn.is_isbn13(_code):
+            _inISBN = _code
+            WIN["inISBN"].update(_code)
+
+            if ahead is not None:
+                _entry, _errs = ahead[1].result()
+                ahead = None
+            else:
+                _entry, _errs = lookup(_code)
+            if _entry["title"] != "":
+                WIN["title"].update(_entry["title"])
+            if _entry["authors"] != []:
+                WIN["author"].update("; ".join(author
+                                               for author
+                                               in _entry["authors"]))
+            WIN["genre"].update("; ".join(_entry["subjects"]))
+            pWin.close()
+
+            for _err in _errs:
+                Popups("e", LANG["err"] + " #" + _err + ": "
+                       + LANG["err" + _err])
+        else:
+            Popups("e", LANG["err"] + " #A3: " + LANG["errA3"])
+            pWin.close()
+    if ev == "Import":
+        bulk(LAST_LOC)
+    if ev == "Find":
+        if LNG == "cs":
+            browse("https://www.databazeknih.cz/search?q="
+                   + val["title"]
+                   + "&hledat=")
+        elif LNG == "en":
+            browse("https://openlibrary.org/search?q="
+                   + val["title"]
+                   + "&mode=everything")
+    if ev == "Add":
+        if (val["author"] != ""
+                and val["title"] != ""
+                and val["genre"] != ""
+                and val["location"] != ""):
+            abbr = LAST_LOC[0]
+
+            try:
+                int(abbr)
+            except ValueError:
+                pWin = Loading()
+                _num = IDS.get(abbr, 0) + 1
+
+                _row = [abbr + str(_num),
+                        _inISBN,
+                        val["author"].replace(",", ";"),
+                        val["title"].replace(",", ";"),
+                        val["genre"].replace(",", ";"),
+                        LAST_LOC,
+                        LANG["fBS"][0]]
+                commit([["i", abbr, _num, IDS.get(abbr)],
+                        ["s", _row, None]])
+                pWin.close()
+                WIN["aErr"].update(LANG["aS"] + _row[0])
+                _inISBN = ""
+                for _key in ("inISBN", "author", "title", "genre"):
+                    WIN[_key].update("")
+            else:
+                WIN["aErr"].update(LANG["err"] + " #A4: " + LANG["errA4"])
         else:
-            vw = CARDS[card]
-    if cEv == "Borrow":
+            WIN["aErr"].update(LANG["err"] + " #A5: " + LANG["errA5"])
+
+
+def bulk(loc: str) -> None:
+    """
+    Imports a list of books from a text or CSV file of ISBNs.
+    < Location
+
+    - Every line is searched for its first valid ISBN
+    - Looks the books up on BULK, while throttle() spaces requests to
+      the same site
+    - Books are given IDs at once and added as one change
+    - Lines which failed are written to retry.txt to be imported again
+    """
+    online()
+    iLO = [[sg.T(LANG["iF"]),
+            sg.I(k="file"),
+            sg.FileBrowse(LANG["iB"],
+                          file_types=((LANG["iT"], "*.txt *.csv"),))],
+           [sg.T(LANG["fBD"][5] + ":"), sg.I(loc, k="location")],
+           [sg.ProgressBar(1, orientation="h", size=(40, 20), k="bar")],
+           [sg.T("", size=(60, 2), k="state")],
+           [sg.B(LANG["cmC"], k="Close"), sg.P(), sg.B(LANG["iS"], k="Start")]]
+    iWin = sg.Window(LANG["name"] + ": " + LANG["aI"],
+                     iLO,
+                     icon=ICON,
+                     modal=True)
+
+    _jobs = {}
+    _fail = []
+    while True:
+        if _jobs == {}:
+            iEv, iVal = iWin.read()
+        else:
+            iEv, iVal = iWin.read(timeout=100)
+
+        if iEv is None or iEv == "Close":
+            for _job in _jobs:
+                _job.cancel()
+            break
+        if iEv == "Start" and _jobs == {}:
+            loc = iVal["location"].replace(",", ";")
+            _fail = []
+            _codes = []
+
+            if iVal["file"] == "" or loc == "":
+                iWin["state"].update(LANG["err"] + " #A5: " + LANG["errA5"])
+                continue
+            try:
+                int(loc[0])
+            except ValueError:
+                pass
+            else:
+                iWin["state"].update(LANG["err"] + " #A4: " + LANG["errA4"])
+                continue
+
+            try:
+                with open(iVal["file"], "r", encoding="utf-8",
+                          errors="replace") as f:
+                    for _line in f:
+                        _code = None
+                        for _cell in re.split("[,;\t]", _line):
+                            _cell = _cell.strip()
+                            _cell = _cell.replace("-", "").replace(" ", "")
+                            if isbn.is_isbn10(_cell) or isbn.is_isbn13(_cell):
+                                _code = _cell
+                                break
+
+                        if _code is not None:
+                            _codes.append(_code)
+                        elif any(_char.isdigit() for _char in _line):
+                            _fail.append(_line.strip())
+                    f.close()
+            except OSError:
+                iWin["state"].update(LANG["err"] + " #I: " + LANG["errI"])
+                continue
+
+            for _code in _codes:
+                _jobs[BULK.submit(lookup, _code, False)] = _code
+            iWin["bar"].update(0, max=max(1, len(_codes)))
+            iWin["state"].update("")
+
+        if _jobs != {}:
+            _done = [_job for _job in _jobs if _job.done()]
+            iWin["bar"].update(len(_done))
+            if len(_done) < len(_jobs):
+                continue
+
+            _books = []
+            for _job, _code in _jobs.items():
+                _entry, _errs = _job.result()
+                if (_errs == []
+                        and _entry["title"] != ""
+                        and _entry["authors"] != []
+                        and _entry["subjects"] != []):
+                    _books.append((_code, _entry))
+                else:
+                    _fail.append(_code)
+            _jobs = {}
+
+            if _books != []:
+                abbr = loc[0]
+                _num = IDS.get(abbr, 0)
+                _ops = [["i", abbr, _num + len(_books), IDS.get(abbr)]]
+                for _code, _entry in _books:
+                    _num += 1
+                    _ops.append(["s",
+                                 [abbr + str(_num),
+                                  _code,
+                                  "; ".join(_entry["authors"])
+                                  .replace(",", ";"),
+                                  _entry["title"].replace(",", ";"),
+                                  "; ".join(_entry["subjects"]),
+                                  loc,
+                                  LANG["fBS"][0]],
+                                 None])
+                commit(_ops)
+
+            with LOCK:
+                store((LANG["fM"] + ".json"),
+                      lambda f: jdump(META, f, ensure_ascii=False))
+            store((LANG["fR"] + ".txt"),
+                  lambda f: f.write("".join(_line + "\n"
+                                            for _line in _fail)))
+            iWin["state"].update(LANG["iD"] + str(len(_books)) + "\n"
+                                 + LANG["iR"] + LANG["fR"] + ".txt: "
+                                 + str(len(_fail)))
+
+    iWin.close()
+
+
+def search(ev, val: dict) -> None:
+    """
+    Allows the search of book records.
+    # res
+    < Event, Values
+
+    - Possible filters:
+      - Genre
+      - Author
+      - Title
+    - Matches parts of words through GRAMS, narrowing from the rarest one
+    - Searches again after a result has been edited
+    """
+    global res
+
+    if type(ev) == tuple and ev[0] == "sTable":
+        if (ev[2][0] != -1
+                and ev[2][1] != -1
+                and ev[2][0] is not None
+                and ev[2][0] < len(res)):
+            id = res[ev[2][0]][0]
+
+            if id in INDEX:
+                edit(id)
+                ev = "Search"
+    if ev == "Search":
+        par = [val["zero"].lower(),
+               val["one"].lower(),
+               val["two"].lower()]
+        res = []
+        _sets = []
+
+        for i, col in ((0, 4), (1, 2), (2, 3)):
+            if par[i] != "":
+                _sets.append(matches(col, par[i]))
+
+        if _sets != []:
+            _sets.sort(key=len)
+            _hits = _sets[0]
+            for _ids in _sets[1:]:
+                _hits &= _ids
+
+            for _id in _hits:
+                res.append(INDEX[_id])
+            res.sort(key=lambda _row: sortkey(_row, SORT), reverse=REVERSE)
+
+        WIN["sTotal"].update(LANG["sT"] + str(len(res)))
+        WIN["sTable"].update(values=res)
+
+
+def lending(row: list, card: str) -> list:
+    """
+    Returns the ops that lend a book to a card.
+    < Row of the book, Card
+    """
+    _new = list(row)
+    _new[6] = LANG["fBS"][1] + ":" + card
+    _due = date.today().toordinal() + period(card, row[5])
+    return [["s", _new, row],
+            ["l", card, [row[0], str(date.today()), _due], True]]
+
+
+def returning(row: list) -> list:
+    """
+    Returns the ops that return a borrowed book.
+    < Row of the book
+
+    - The loan is taken from LOANS
+    """
+    _new = list(row)
+    _new[6] = LANG["fBS"][0]
+    _card, _loan = LOANS[row[0]]
+    return [["s", _new, row], ["l", _card, _loan, False]]
+
+
+def cards(ev, val: dict) -> None:
+    """
+    The library card interface.
+    # card
+    < Event, Values
+
+    - Add and remove borrowed books from selected card.
+    - See when selected card borrowed which book and until when.
+    - Create and/or delete library cards and set their loan periods.
+    - List and export overdue books.
+    - See who borrowed a book, or what a card borrowed, and when.
+    - Lend and return scanned books quickly at the desk.
+    """
+    global card
+
+    WIN["cErr"].update("")
+    card = val["Card"]
+
+    if ev == "View":
+        if val["Card"] not in CARDS["LIST"]:
+            card = ""
+    if ev == "Borrow":
         if card == "":
-            err = LANG["err"] + " #C1: " + LANG["errC1"]
-        elif cVal["id"] == "":
-            err = LANG["err"] + " #C2: " + LANG["errC2"]
+            WIN["cErr"].update(LANG["err"] + " #C1: " + LANG["errC1"])
+        elif val["id"] == "":
+            WIN["cErr"].update(LANG["err"] + " #C2: " + LANG["errC2"])
         else:
             pWin = Loading()
-            err = LANG["err"] + " #C3: " + LANG["errC3"]
-            for row in ROWS:
-                if row[0] == cVal["id"]:
-                    if row[6] != LANG["fBS"][0]:
-                        err = LANG["err"] + " #C4: " + LANG["errC4"]
-                    else:
-                        err = ""
-                        CARDS[card].append([row[0],
-                                            row[3],
-                                            str(date.today())])
-                        num = ROWS.index(row)
-                        ROWS[num][6] = LANG["fBS"][1] + ":" + card
-                        save("bc")
+            row = INDEX.get(normid(val["id"]))
+            if row is None:
+                WIN["cErr"].update(LANG["err"] + " #C3: " + LANG["errC3"])
+            elif row[6] != LANG["fBS"][0]:
+                WIN["cErr"].update(LANG["err"] + " #C4: " + LANG["errC4"])
+            else:
+                commit(lending(row, card))
             pWin.close()
-    if cEv == "Return":
+    if ev == "Return":
         if card == "":
-            err = LANG["err"] + " #C1: " + LANG["errC1"]
-        elif cVal["id"] == "":
-            err = LANG["err"] + " #C2: " + LANG["errC2"]
+            WIN["cErr"].update(LANG["err"] + " #C1: " + LANG["errC1"])
+        elif val["id"] == "":
+            WIN["cErr"].update(LANG["err"] + " #C2: " + LANG["errC2"])
         else:
             pWin = Loading()
-            err = LANG["err"] + " #C3: " + LANG["errC3"]
-            for row in ROWS:
-                if row[0] == cVal["id"]:
-                    if row[6] == LANG["fBS"][0]:
-                        err = LANG["err"] + " #C5: " + LANG["errC5"]
-                    else:
-                        err = LANG["err"] + " #C6: " + LANG["errC6"]
-                        for entry in CARDS[card]:
-                            if entry[0] == cVal["id"]:
-                                err = ""
-                                num = CARDS[card].index(entry)
-                                CARDS[card].pop(num)
-                                num = ROWS.index(row)
-                                ROWS[num][6] = LANG["fBS"][0]
-                                save("bc")
+            row = INDEX.get(normid(val["id"]))
+            if row is None:
+                WIN["cErr"].update(LANG["err"] + " #C3: " + LANG["errC3"])
+            elif row[6] == LANG["fBS"][0]:
+                WIN["cErr"].update(LANG["err"] + " #C5: " + LANG["errC5"])
+            else:
+                _loan = LOANS.get(row[0])
+                if _loan is None or _loan[0] != card:
+                    WIN["cErr"].update(LANG["err"] + " #C6: "
+                                       + LANG["errC6"])
+                else:
+                    commit(returning(row))
             pWin.close()
-    if cEv == "Manage":
+    if ev == "Overdue":
+        overdue()
+    if ev == "Desk":
+        card = desk(card)
+    if ev == "History":
+        if val["id"] != "":
+            circulation("books", normid(val["id"]))
+        elif card != "":
+            circulation("cards", card)
+        else:
+            WIN["cErr"].update(LANG["err"] + " #C2: " + LANG["errC2"])
+    if ev == "Manage":
         err = ""
         while True:
             cmLO = [[sg.T(LANG["cmN"]),
                     sg.I(k="name"),
                     sg.B(LANG["a"], k="Add"),
                     sg.B(LANG["del"], k="Delete")],
+                    [sg.T(LANG["cmP"]),
+                    sg.I(k="days", size=(5, 1)),
+                    sg.B(LANG["cmS"], k="Period")],
                     [sg.T(err), sg.P(), sg.B(LANG["cmC"], k="Close")]]
             cmWin = sg.Window((LANG["name"] + ": " + LANG["cm"]),
                               cmLO,
-                              icon=ICON)
+                              icon=ICON,
+                              modal=True)
             cmEv, cmVal = cmWin.read()
 
             err = ""
@@ -1160,9 +2565,7 @@ def cards() -> None:
                     err = LANG["err"] + " #CM2: " + LANG["errCM2"]
                 else:
                     pWin = Loading()
-                    CARDS["LIST"].append(name)
-                    CARDS[name] = []
-                    save("c")
+                    commit([["c", name, [], None]])
                     pWin.close()
                     break
             if cmEv == "Delete":
@@ -1176,63 +2579,239 @@ def cards() -> None:
                     ans = Popups("yn", LANG["cmY"])
                     if ans == "Yes":
                         pWin = Loading()
-                        CARDS["LIST"].remove(name)
-                        CARDS.pop(name)
-                        save("c")
+                        commit([["c", name, None, []]])
                         pWin.close()
+                        if card == name:
+                            card = ""
                         break
+            if cmEv == "Period":
+                if name == "":
+                    err = LANG["err"] + " #CM1: " + LANG["errCM1"]
+                elif name not in CARDS["LIST"]:
+                    err = LANG["err"] + " #CM3: " + LANG["errCM3"]
+                elif not cmVal["days"].isdigit() or int(cmVal["days"]) == 0:
+                    err = LANG["err"] + " #CM5: " + LANG["errCM5"]
+                else:
+                    CONFIG["cards"][name] = int(cmVal["days"])
+                    store("config.json", lambda f: jdump(CONFIG, f))
+                    break
+
+
+def desk(card: str) -> str:
+    """
+    Lends and returns books scanned one after another.
+    < Card
+
+    - The input keeps the focus and Enter, which scanners send after
+      every code, submits it
+    - A scanned card gets selected, a scanned book is lent to it, or
+      returned when it's out
+    - Changes are applied at once and written in groups by WRITER, so a
+      scan never waits for the disk
+    - Writes that failed are shown in the log, or on closing
+    - Returns the card selected last
+    """
+    def _failed(jobs):
+        _errs = []
+        for _job in jobs:
+            FLUSHES.remove(_job)
+            if _job.exception() is not None:
+                _errs.append(LANG["err"] + " #O: " + LANG["errO"] + " ("
+                             + str(_job.exception()) + ")")
+        return _errs
+
+    dLO = [[sg.T(LANG["cC"] + card, size=(30, 1), k="dCard")],
+           [sg.T(LANG["dS"]), sg.I(k="scan", focus=True)],
+           [sg.Listbox(values=[], size=(60, 10), k="dLog")],
+           [sg.P(), sg.B(LANG["cmC"], k="Close")]]
+    dWin = sg.Window(LANG["name"] + ": " + LANG["cD"],
+                     dLO,
+                     icon=ICON,
+                     modal=True,
+                     finalize=True)
+    dWin.bind("<Return>", "Enter")
+
+    _done = deque(maxlen=10)
+    while True:
+        dEv, dVal = dWin.read()
+
+        if dEv is None or dEv == "Close":
+            break
+        if dEv != "Enter" or dVal["scan"].strip() == "":
+            continue
+
+        _code = dVal["scan"].strip()
+        dWin["scan"].update("")
+        row = INDEX.get(normid(_code))
+        if _code in CARDS["LIST"]:
+            card = _code
+            dWin["dCard"].update(LANG["cC"] + card)
+            _msg = LANG["cC"] + card
+        elif row is None:
+            _msg = _code + ": " + LANG["err"] + " #C3: " + LANG["errC3"]
+        elif row[6] == LANG["fBS"][0]:
+            if card == "":
+                _msg = (_code + ": " + LANG["err"] + " #C1: "
+                        + LANG["errC1"])
+            else:
+                lodge(lending(row, card))
+                _msg = (row[0] + " " + row[3] + ": " + LANG["yB"]
+                        + " (" + card + ")")
+        elif row[0] not in LOANS:
+            _msg = _code + ": " + LANG["err"] + " #C6: " + LANG["errC6"]
+        else:
+            _msg = (row[0] + " " + row[3] + ": " + LANG["yR"]
+                    + " (" + LOANS[row[0]][0] + ")")
+            lodge(returning(row))
+
+        _done.appendleft(_msg)
+        for _err in _failed([j for j in FLUSHES if j.done()]):
+            _done.appendleft(_err)
+        dWin["dLog"].update(values=list(_done))
+        dWin["scan"].set_focus()
+
+    # Writes what's left before the main window loads the files again
+    FLUSHES.append(WRITER.submit(flush))
+    _errs = _failed(list(FLUSHES))
+    dWin.close()
+    if _errs != []:
+        Popups("e", _errs[0])
+    return card
+
+
+def overdue() -> None:
+    """
+    Lists the books that should have been returned and exports them.
+
+    - Overdue loans are the head of DUE, so k of them are found in
+      O(k + log n) without reading the cards
+    - Exports the list as CSV, e.g. for reminders
+    """
+    _rows = []
+    for _due, _id in DUE[0:bisect_left(DUE, (date.today().toordinal(),))]:
+        if _id in INDEX:
+            _title = INDEX[_id][3]
+        else:
+            _title = ""
+        _rows.append([_id, _title, LOANS[_id][0],
+                      date.fromordinal(_due).isoformat()])
+
+    oLO = [[sg.Table(values=_rows,
+                     headings=LANG["oH"],
+                     auto_size_columns=True,
+                     max_col_width=30,
+                     justification="center",
+                     num_rows=20,
+                     alternating_row_color="#a0ca6d",
+                     k="oTable")],
+           [sg.T(LANG["oF"]),
+            sg.I(k="file"),
+            sg.FileSaveAs(LANG["iB"],
+                          file_types=(("CSV", "*.csv"),),
+                          default_extension=".csv")],
+           [sg.T("", size=(60, 1), k="state")],
+           [sg.B(LANG["cmC"], k="Close"),
+            sg.P(),
+            sg.B(LANG["oE"], k="Export")]]
+    oWin = sg.Window(LANG["name"] + ": " + LANG["cO"],
+                     oLO,
+                     icon=ICON,
+                     modal=True)
+
+    while True:
+        oEv, oVal = oWin.read()
+
+        if oEv is None or oEv == "Close":
+            break
+        if oEv == "Export" and oVal["file"] != "":
+            try:
+                with open(oVal["file"], "w", encoding="utf-8") as f:
+                    _wrt = cwrite(f)
+                    _wrt.writerow(LANG["oH"])
+                    _wrt.writerows(_rows)
+                    f.close()
+            except OSError:
+                oWin["state"].update(LANG["err"] + " #O: " + LANG["errO"])
+            else:
+                oWin["state"].update(LANG["oD"] + oVal["file"])
+
+    oWin.close()
+
 
+def circulation(field: str, key: str) -> None:
+    """
+    Shows the history of a book or a card.
+    < "books" or "cards", Book ID or card
 
-def help() -> None:
+    - A year narrows the events down, e.g. to see a card's loans of 2026
+    """
+    yLO = [[sg.T(LANG["yY"]),
+            sg.I(k="year", size=(6, 1)),
+            sg.B(LANG["cV"], k="View")],
+           [sg.Table(values=[],
+                     headings=LANG["yH"],
+                     auto_size_columns=True,
+                     max_col_width=30,
+                     justification="center",
+                     num_rows=20,
+                     alternating_row_color="#a0ca6d",
+                     k="yTable")],
+           [sg.P(), sg.B(LANG["cmC"], k="Close")]]
+    yWin = sg.Window(LANG["name"] + ": " + LANG["cY"] + " " + key,
+                     yLO,
+                     icon=ICON,
+                     modal=True,
+                     finalize=True)
+
+    _year = None
+    while True:
+        _rows = []
+        for _day, _kind, _id, _card in recall(field, key, _year):
+            if _kind == "b":
+                _kind = LANG["yB"]
+            else:
+                _kind = LANG["yR"]
+            if _id in INDEX:
+                _title = INDEX[_id][3]
+            else:
+                _title = ""
+            _rows.append([date.fromordinal(_day).isoformat(), _kind, _id,
+                          _title, _card])
+        yWin["yTable"].update(values=_rows)
+
+        yEv, yVal = yWin.read()
+        if yEv is None or yEv == "Close":
+            break
+        if yEv == "View":
+            if yVal["year"].isdigit():
+                _year = int(yVal["year"])
+            else:
+                _year = None
+
+    yWin.close()
+
+
+def help(ev, val: dict) -> None:
     """
     A simple text file interface.
-    @ HELP, WINDOW, CHANGED
+    < Event, Values
 
     - Allows reading and editing help.txt
+    - Turns the splash screens on and off in config.json
     """
-    global HELP, WINDOW, CHANGED
-    hLO = [[sg.P(),
-            sg.B(LANG["m"], k="Main"),
-            sg.B(LANG["a"], k="Add"),
-            sg.B(LANG["s"], k="Search"),
-            sg.B(LANG["c"], k="Cards"),
-            sg.B("[" + LANG["h"] + "]"),
-            sg.B(LANG["u"], k="Undo"),
-            sg.P()],
-           [sg.T(LANG["h"] + ":")],
-           [sg.Multiline(HELP, k="help", size=(60, 20))],
-           [sg.P(), sg.B(LANG["hS"], k="Save")]]
-    hWin = sg.Window(LANG["name"], hLO, icon=ICON)
-    hEv, hVal = hWin.read()
-
-    hWin.close()
-    if hEv is None:
-        WINDOW = ""
-    if hEv == "Main":
-        WINDOW = "m"
-        CHANGED = True
-    if hEv == "Add":
-        WINDOW = "a"
-        CHANGED = True
-    if hEv == "Search":
-        WINDOW = "s"
-        CHANGED = True
-    if hEv == "Cards":
-        WINDOW = "c"
-        CHANGED = True
-    if hEv == "Undo":
-        WINDOW = "u"
-    if hEv == "Save":
+    if ev == "Fast":
+        CONFIG["fast"] = val["Fast"]
+        store("config.json", lambda f: jdump(CONFIG, f))
+    if ev == "Save":
         pWin = Loading()
-        HELP = hVal["help"]
-        save("h")
+        commit([["h", val["help"], HELP]])
         pWin.close()
 
 
-def edit(row: int) -> None:
+def edit(id: str) -> None:
     """
     Makes editing book records possible.
-    @ CHANGED
+    < Book ID
 
     - You can edit:
       - Author(s)
@@ -1240,10 +2819,8 @@ def edit(row: int) -> None:
       - Genre(s)
       - Location - also changes the ID
     """
-    global CHANGED
-
-    CHANGED = True
-    r = ROWS[row]
+    _orig = INDEX[id]
+    r = list(_orig)
     loc = r[5]
     err = ""
 
@@ -1262,7 +2839,10 @@ def edit(row: int) -> None:
                 sg.P(),
                 sg.B(LANG["del"], k="Delete"),
                 sg.B(LANG["e"], k="Edit", bind_return_key=True)]]
-        eWin = sg.Window(LANG["name"] + ": " + LANG["e"], eLO, icon=ICON)
+        eWin = sg.Window(LANG["name"] + ": " + LANG["e"],
+                         eLO,
+                         icon=ICON,
+                         modal=True)
         eEv, eVal = eWin.read()
 
         err = ""
@@ -1279,20 +2859,19 @@ def edit(row: int) -> None:
 
         if eEv == "Search":
             if LNG == "cs":
-                webbrowser.open(url=("https://www.databazeknih.cz/search?q="
-                                     + eVal["title"]
-                                     + "&hledat="))
+                browse("https://www.databazeknih.cz/search?q="
+                       + eVal["title"]
+                       + "&hledat=")
             elif LNG == "en":
-                webbrowser.open(url=("https://openlibrary.org/search?q="
-                                     + eVal["title"]
-                                     + "&mode=everything"))
+                browse("https://openlibrary.org/search?q="
+                       + eVal["title"]
+                       + "&mode=everything")
         if eEv == "Delete":
             if r[6] == LANG["fBS"][0]:
                 ans = Popups("yn", LANG["eDQ"])
                 if ans == "Yes":
-                    ROWS.pop(row)
                     pWin = Loading()
-                    save("b")
+                    commit([["d", _orig[0], _orig]])
                     pWin.close()
 
                     break
@@ -1304,6 +2883,7 @@ def edit(row: int) -> None:
                     err = LANG["err"] + " #E2: " + LANG["errE2"]
                 else:
                     pWin = Loading()
+                    _ops = [["s", r, _orig]]
                     if r[5][0] != loc[0]:
                         abbr = r[5][0]
 
@@ -1313,44 +2893,51 @@ def edit(row: int) -> None:
                             pass
                         else:
                             err = LANG["err"] + " #E3: " + LANG["errE3"]
+                            pWin.close()
                             continue
 
-                        if abbr not in IDS:
-                            IDS[abbr] = 0
-
-                        IDS[abbr] += 1
+                        _num = IDS.get(abbr, 0) + 1
 
-                        if len(str(IDS[abbr] - 1)) != len(str(IDS[abbr])):
-                            expander(abbr)
+                        r[0] = abbr + str(_num)
+                        _ops = [["d", _orig[0], _orig],
+                                ["i", abbr, _num, IDS.get(abbr)],
+                                ["s", r, None]]
 
-                        r[0] = abbr + str(IDS[abbr])
-
-                    ROWS[row] = r
-                    save("b")
+                    commit(_ops)
                     pWin.close()
                     break
             else:
                 err = LANG["err"] + " #E4: " + LANG["errE4"]
 
 
+# Builds the offline index instead of starting the app
+if ARGS.ingest is not None:
+    ingest(ARGS.ingest)
+    sys.exit()
+
+# Loading and the update check run while the splashes are shown
+LOADED = POOL.submit(load)
+CHECK = POOL.submit(release)
+
 # Splash image
-spLO = [[sg.P(),
-         sg.T(LANG["name"]),
-         sg.P()],
-        [sg.P(),
-         sg.Image(ICON),
-         sg.P()],
-        [sg.T(VERSION),
-         sg.P(),
-         sg.T(LANG["by"] + " F_TEK")]]
-spWin = sg.Window("",
-                  spLO,
-                  no_titlebar=True,
-                  disable_close=True,
-                  disable_minimize=True,
-                  keep_on_top=True)
-spWin.read(1500)
-spWin.close()
+if not CONFIG["fast"]:
+    spLO = [[sg.P(),
+             sg.T(LANG["name"]),
+             sg.P()],
+            [sg.P(),
+             sg.Image(ICON),
+             sg.P()],
+            [sg.T(VERSION),
+             sg.P(),
+             sg.T(LANG["by"] + " F_TEK")]]
+    spWin = sg.Window("",
+                      spLO,
+                      no_titlebar=True,
+                      disable_close=True,
+                      disable_minimize=True,
+                      keep_on_top=True)
+    spWin.read(1500)
+    spWin.close()
 
 LICENSE = """Library Parrotex  Copyright (C) 2023  Foxie EdianiaK a.k.a. F_TEK
 - This program comes with ABSOLUTELY NO WARRANTY.
@@ -1359,51 +2946,95 @@ LICENSE = """Library Parrotex  Copyright (C) 2023  Foxie EdianiaK a.k.a. F_TEK
 - For more details refer to the attached README.txt file
   or to the LICENSE file in the GitHub repository."""
 
-spLO = [[sg.T(LICENSE)]]
-spWin = sg.Window("",
-                  spLO,
-                  no_titlebar=True,
-                  disable_close=True,
-                  disable_minimize=True,
-                  keep_on_top=True)
-spWin.read(3000)
-spWin.close()
-
-# Update check
-try:
-    _ver = requests.get("https://api.github.com/repos/ftedianiak/"
-                        + "library-parrotex/releases")
-except requests.exceptions.ConnectionError:
-    Popups("e", LANG["err"] + " #G: " + LANG["errG"])
-else:
-    if _ver.status_code == 200:
-        _chk = jloads(_ver.text)[0]["name"]
-        if VERSION != _chk:
-            ans = Popups("yn", LANG["up"])
-            if ans == "Yes":
-                webbrowser.open("https://github.com/FTEdianiaK/"
-                                + "library-parrotex/releases/latest")
-    else:
-        Popups("e", LANG["err"] + " #G: " + LANG["errG"])
+if not CONFIG["fast"]:
+    spLO = [[sg.T(LICENSE)]]
+    spWin = sg.Window("",
+                      spLO,
+                      no_titlebar=True,
+                      disable_close=True,
+                      disable_minimize=True,
+                      keep_on_top=True)
+    spWin.read(3000)
+    spWin.close()
 
 # Sets main GUI theme
 sg.theme("DarkGreen")
 
+# Tab states
+page = 0
+num = 30
+final = 0
+view = []
+res = []
+card = ""
+shown = None
+_inISBN = ""
+ahead = None
+
+# Main window, its tabs are updated in place between events
+LOADED.result()
+WIN = sg.Window(LANG["name"], layout(), icon=ICON, finalize=True)
+WIN.bind("<Return>", "Enter")
+refresh("TabM")
+
+if ARGS.bench:
+    print("Imports: " + str(round(IMPORTED - START, 3)) + " s, budget "
+          + str(IMPORT_BUDGET) + " s")
+    print("Startup: " + str(round(perf_counter() - START, 3)) + " s")
+    WIN.close()
+    POOL.shutdown(wait=False, cancel_futures=True)
+    BULK.shutdown(wait=False, cancel_futures=True)
+    sys.exit(IMPORTED - START > IMPORT_BUDGET)
+
+CHECK.add_done_callback(lambda f: WIN.write_event_value("Checked",
+                                                        f.result()))
+
 # Main loop
 while True:
-    load()
+    ev, val = WIN.read()
 
-    if WINDOW == "":
+    if ev is None:
         break
-    elif WINDOW == "m":
-        main()
-    elif WINDOW == "a":
-        add()
-    elif WINDOW == "s":
-        search()
-    elif WINDOW == "c":
-        cards()
-    elif WINDOW == "h":
-        help()
-    elif WINDOW == "u":
-        undo()
+
+    # A newer release only shows up as a button on the Main tab
+    if ev == "Checked":
+        if val["Checked"] not in ("", VERSION):
+            WIN["Upgrade"].update(visible=True)
+        continue
+
+    # Files WRITER is saving are our own, changes from outside show up
+    # at the next event
+    if DESK.acquire(blocking=False):
+        load()
+        DESK.release()
+
+    tab = val["Tabs"]
+    if ev == "Enter":
+        ev = {"TabA": "Add", "TabS": "Search"}.get(tab, ev)
+
+    if tab == "TabM":
+        main(ev, val)
+    elif tab == "TabA":
+        add(ev, val)
+    elif tab == "TabS":
+        search(ev, val)
+    elif tab == "TabC":
+        cards(ev, val)
+    elif tab == "TabH":
+        help(ev, val)
+    elif tab == "TabU":
+        undo(ev, val)
+
+    refresh(tab)
+
+WIN.close()
+POOL.shutdown(wait=False, cancel_futures=True)
+BULK.shutdown(wait=False, cancel_futures=True)
+WRITER.shutdown()
+
+# Folds the journal into books.csv and cards.json, so spreadsheets see
+# every change, and saves the search indexes that match them
+if JOURNAL > 0:
+    save("b")
+if not KEPT:
+    keep()